@@ -7,43 +7,135 @@ Discordチャンネルから直接XLSXファイルにエクスポートするス
 import argparse
 import asyncio
 import json
+import logging
 import os
+import re
 import sys
+import tempfile
 import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import chain
 from datetime import datetime, timezone
 
+# デバッグ用のロガー（--debug 指定時のみ出力）
+logger = logging.getLogger("discord_exporter")
+
 # SSL関連の警告を抑制
 warnings.filterwarnings("ignore", category=RuntimeWarning, message=".*Event loop is closed.*")
 warnings.filterwarnings("ignore", category=ResourceWarning, message=".*unclosed.*")
 
-import discord
-import pandas as pd
+# discord.py / pandas / numpy は読み込みが重いため、使用するメソッド内でインポートする
 import curses
+from rich.cells import cell_len, set_cell_size
 from rich.console import Console
-from rich.table import Table
+from rich.markup import escape
+
+# 共有のrichコンソール（端末情報の検出は一度だけ）
+CONSOLE = Console()
+
+# orjsonがあれば高速なJSONエンコード/デコードを使用（なければ標準のjson）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def json_loads(data):
+        """JSON（bytes/str）を読み込む"""
+        return orjson.loads(data)
+
+    def json_dumps(obj):
+        """オブジェクトをコンパクトなJSONのbytesにする"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def json_loads(data):
+        """JSON（bytes/str）を読み込む"""
+        return json.loads(data)
+
+    def _json_default(obj):
+        # orjsonと同様にdatetimeはISO 8601形式で書き出す
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def json_dumps(obj):
+        """オブジェクトをコンパクトなJSONのbytesにする"""
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        ).encode("utf-8")
 
 # クロスプラットフォーム対応の一文字入力
-def getch():
-    """一文字入力を取得（クロスプラットフォーム対応）"""
+# 入力バックエンドはインポート時に一度だけ決定する
+try:
+    # Windows
+    import msvcrt
+except ImportError:
+    msvcrt = None
     try:
-        # Windows
-        import msvcrt
-        return msvcrt.getch().decode('utf-8')
+        # Unix/Linux/Mac
+        import termios
+        import tty
     except ImportError:
+        termios = None
+        tty = None
+
+# raw_tty() のネスト数（cbreakモード中はモード切替を省略する）
+_raw_tty_depth = 0
+
+@contextmanager
+def raw_tty():
+    """
+    ブロック内で端末をcbreakモードに保つ（Unixのみ）
+    プロンプト単位でモードを切り替え、キー入力毎のtcsetattrを避ける
+    """
+    global _raw_tty_depth
+    if termios is None or _raw_tty_depth > 0 or not sys.stdin.isatty():
+        _raw_tty_depth += 1
         try:
-            # Unix/Linux/Mac
-            import termios, tty
-            fd = sys.stdin.fileno()
-            old_settings = termios.tcgetattr(fd)
-            try:
-                tty.setcbreak(fd)  # tty.cbreak → tty.setcbreak に修正
-                ch = sys.stdin.read(1)
-            finally:
-                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-            return ch
-        except Exception:
-            # フォールバック: 通常の入力
-            return input().strip()[:1] if input().strip() else '\n'
+            yield
+        finally:
+            _raw_tty_depth -= 1
+        return
+
+    fd = sys.stdin.fileno()
+    old_settings = termios.tcgetattr(fd)
+    _raw_tty_depth += 1
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        _raw_tty_depth -= 1
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+
+def _getch_windows():
+    return msvcrt.getch().decode('utf-8')
+
+def _getch_unix():
+    # パイプ等の非端末入力では1文字だけ読むと改行が次のプロンプトに残るため、行単位で読む
+    if not sys.stdin.isatty():
+        return _getch_fallback()
+    try:
+        with raw_tty():
+            return sys.stdin.read(1)
+    except Exception:
+        return _getch_fallback()
+
+def _getch_fallback():
+    # フォールバック: 通常の入力
+    line = input().strip()
+    return line[:1] if line else '\n'
+
+if msvcrt is not None:
+    _getch_impl = _getch_windows
+elif termios is not None:
+    _getch_impl = _getch_unix
+else:
+    _getch_impl = _getch_fallback
+
+def getch():
+    """一文字入力を取得（クロスプラットフォーム対応）"""
+    return _getch_impl()
 
 def get_single_key_input(prompt):
     """
@@ -58,18 +150,299 @@ def get_single_key_input(prompt):
         response = input().strip().lower()
         return response[0] if response else '\n'
 
+def _iter_rows(df):
+    """
+    DataFrameの各行をPythonの値のタプルとして返す
+    列毎に一度だけtolist()してzipする方がitertuplesより速い
+    """
+    columns = []
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if column.dtype.kind == "M":
+            # 日時列の欠損(NaT)は空セルにする
+            column = column.astype(object).where(column.notna(), None)
+        columns.append(column.tolist())
+    return zip(*columns)
+
+def _sheet_rows(data):
+    """
+    シートの全行（見出し行を含む）を返す
+    DataFrame以外は見出し行から始まる行のリストとしてそのまま使う
+    """
+    if isinstance(data, list):
+        return data
+    return chain([list(data.columns)], _iter_rows(data))
+
+# XLSXの1シートに書き出すデータ行数の上限（Excelの上限は見出し行を含め1,048,576行）
+XLSX_ROWS_PER_SHEET = 1_000_000
+
+def _split_sheets(sheets):
+    """
+    XLSXの行数上限を超えるDataFrameを複数シート（シート名_1, シート名_2, ...）に分割する
+    """
+    for sheet_name, df in sheets:
+        if isinstance(df, list) or len(df) <= XLSX_ROWS_PER_SHEET:
+            yield sheet_name, df
+            continue
+        for number, start in enumerate(range(0, len(df), XLSX_ROWS_PER_SHEET), 1):
+            yield f"{sheet_name}_{number}", df.iloc[start:start + XLSX_ROWS_PER_SHEET]
+
+def write_xlsx(output_file, sheets):
+    """
+    DataFrameをXLSXファイルに書き出す
+
+    pandasのto_excelはセル毎にスタイル処理を行うため大量行で非常に遅い。
+    xlsxwriterがあればconstant_memoryモードで行毎にディスクへ書き出し、
+    なければopenpyxlのwrite_onlyモードで行単位にストリーム書き込みする。
+    lxmlがインストールされていればopenpyxlは自動的にlxmlでXMLを書き出す。
+    XLSX_ROWS_PER_SHEET 行を超えるシートは複数シートに分割する。
+
+    Args:
+        output_file (str): 出力ファイル名
+        sheets (list): (シート名, DataFrame または見出し行から始まる行のリスト) のリスト
+    """
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(
+            output_file,
+            {
+                "constant_memory": True,
+                "default_date_format": "yyyy-mm-dd hh:mm:ss",
+                "nan_inf_to_errors": True,
+                # メッセージ本文やURLはハイパーリンク・数式に変換せずそのまま書き出す
+                # （ハイパーリンクはシート毎に65,530個までで、超えたセルは書き出されない）
+                "strings_to_urls": False,
+                "strings_to_formulas": False,
+            },
+        )
+        for sheet_name, data in _split_sheets(sheets):
+            worksheet = workbook.add_worksheet(sheet_name)
+            write = worksheet.write
+            write_string = worksheet.write_string
+            for row_index, row in enumerate(_sheet_rows(data)):
+                for column_index, value in enumerate(row):
+                    if isinstance(value, str):
+                        write_string(row_index, column_index, value)
+                    else:
+                        write(row_index, column_index, value)
+        workbook.close()
+        return
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, data in _split_sheets(sheets):
+        worksheet = workbook.create_sheet(title=sheet_name)
+        append = worksheet.append
+        for row in _sheet_rows(data):
+            append(row)
+    workbook.save(output_file)
+
+# 対応するエクスポート形式
+EXPORT_FORMATS = ("xlsx", "parquet", "feather", "csv")
+
+def detect_export_format(output_file, output_format=None):
+    """
+    エクスポート形式を決定（未指定の場合は出力ファイルの拡張子から判定）
+    """
+    if output_format:
+        return output_format
+    ext = os.path.splitext(output_file)[1].lower().lstrip(".")
+    return ext if ext in EXPORT_FORMATS else "xlsx"
+
+def write_export(output_file, sheets, output_format="xlsx"):
+    """
+    指定された形式でエクスポートファイルを書き出す
+
+    xlsx以外の形式は1ファイル1テーブルのため、先頭のメッセージシートのみ出力する。
+
+    Args:
+        output_file (str): 出力ファイル名
+        sheets (list): (シート名, DataFrame または見出し行から始まる行のリスト) のリスト
+        output_format (str): xlsx / parquet / feather / csv
+    """
+    if output_format == "xlsx":
+        write_xlsx(output_file, sheets)
+        return
+
+    _, df = sheets[0]
+    df = df.reset_index(drop=True)
+    if output_format == "parquet":
+        df.to_parquet(output_file, compression="zstd", index=False)
+    elif output_format == "feather":
+        df.to_feather(output_file, compression="lz4")
+    elif output_format == "csv":
+        df.to_csv(
+            output_file, index=False, encoding="utf-8-sig", date_format="%Y-%m-%d %H:%M:%S"
+        )
+    else:
+        raise ValueError(f"未対応のエクスポート形式: {output_format}")
+
+def fit_to_width(text, max_width):
+    """
+    文字列を端末の表示幅（全角文字は2セル）に収まるように切り詰める
+    """
+    if cell_len(text) <= max_width:
+        return text
+    if max_width <= 3:
+        return set_cell_size(text, max(max_width, 0))
+    return set_cell_size(text, max_width - 3) + "..."
+
+def next_progress_report(count):
+    """
+    count件の次に進捗を表示する件数を返す
+    100, 200, 500, 1000, 2000, 5000, 10000 と間隔を広げ、以降は10000件毎
+    """
+    if count >= 10000:
+        return (count // 10000 + 1) * 10000
+    step = 100
+    while True:
+        for multiplier in (1, 2, 5):
+            if step * multiplier > count:
+                return step * multiplier
+        step *= 10
+
+# 単一チャンネルエクスポートのMessagesシートの1行（辞書より軽量な固定長の行）
+ChannelMessageRow = namedtuple("ChannelMessageRow", (
+    "timestamp",
+    "author_name",
+    "author_id",
+    "content",
+    "message_id",
+    "channel_name",
+    "edited_at",
+    "reply_to",
+    "attachments_count",
+    "attachments_urls",
+    "reactions_count",
+    "reactions",
+    "mentions",
+    "is_bot",
+    "message_type",
+))
+CHANNEL_MESSAGE_COLUMNS = ChannelMessageRow._fields
+
+# 複数チャンネルエクスポートのAll_Messagesシートの列（列毎のリストで保持する）
+MULTI_MESSAGE_COLUMNS = (
+    "timestamp",
+    "author_name",
+    "author_id",
+    "content",
+    "message_id",
+    "guild_name",
+    "channel_name",
+    "edited_at",
+    "reply_to",
+    "attachments_count",
+    "attachments_urls",
+    "reactions_count",
+    "reactions",
+    "mentions",
+    "is_bot",
+    "message_type",
+)
+
+# 単一チャンネルエクスポートで取得済みの行をチェックポイントへ書き出す間隔
+CHECKPOINT_INTERVAL = 500
+
+# チャンネル選択入力の1要素（"3" または "1-5"）
+SELECTION_PATTERN = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+))?\s*$")
+
+# 複数チャンネルエクスポートで列毎のリストをDataFrameにまとめて解放するまでに溜めるメッセージ数
+FRAME_BATCH_SIZE = 10_000
+
+# カテゴリーに属さないチャンネルの表示名
+UNCATEGORIZED = "未分類"
+
 # 必要なライブラリのインストール
 # pip install discord.py pandas openpyxl
 
 
 class DiscordExporter:
     def __init__(self, token):
-        intents = discord.Intents.default()
-        intents.message_content = True
-        self.client = discord.Client(intents=intents)
+        self._create_client()
         self.token = token
         self.channels_file = "channels.json"
         self.config_file = "config.json"
+        # 設定ファイルのキャッシュ（更新時刻が変わった時のみ再読み込み）
+        self._config_cache = None
+        self._config_mtime = None
+        # チャンネル情報のキャッシュ（更新時刻が変わった時のみ再読み込み）
+        self._channels_info_cache = None
+        self._channels_info_mtime = None
+
+    def _create_client(self):
+        """
+        Discordクライアントを作成（ログイン状態は初期化）
+        """
+        import discord
+
+        intents = discord.Intents.default()
+        intents.message_content = True
+        self.client = discord.Client(intents=intents)
+        # login() によるHTTPログインは処理毎に閉じずに使い回す（ゲートウェイ接続は処理中のみ）
+        self._logged_in = False
+        self._client_task = None
+
+    async def login(self, token):
+        """
+        Discordにログインしてゲートウェイに接続し、準備完了まで待つ
+        （同じTokenでHTTPログイン済みならログインは再利用する）
+        """
+        if self._logged_in and self.token != token:
+            # Tokenが変わった場合は新しいクライアントでログインし直す
+            await self.cleanup_client()
+            self._create_client()
+
+        if not self._logged_in:
+            try:
+                await self.client.login(token)
+            except Exception:
+                await self.cleanup_client()
+                self._create_client()
+                raise
+            self.token = token
+            self._logged_in = True
+
+        ready = asyncio.Event()
+
+        @self.client.event
+        async def on_ready():
+            ready.set()
+
+        self._client_task = asyncio.create_task(self.client.connect())
+        ready_task = asyncio.create_task(ready.wait())
+        await asyncio.wait(
+            {self._client_task, ready_task}, return_when=asyncio.FIRST_COMPLETED
+        )
+
+        if not ready.is_set():
+            # 準備完了前にゲートウェイ接続が終了した
+            ready_task.cancel()
+            client_task = self._client_task
+            await self.disconnect_gateway()
+            client_task.result()
+            raise RuntimeError("Discordへの接続が終了しました")
+
+        print(f"ログイン: {self.client.user}")
+
+    async def disconnect_gateway(self):
+        """
+        ゲートウェイ接続だけを閉じる（HTTPのログインは維持する）
+        メニューや入力待ちの間はイベントループが止まり、ハートビートが送れなくなるため
+        """
+        if self._client_task is None:
+            return
+        client_task = self._client_task
+        self._client_task = None
+        client_task.cancel()
+        await asyncio.gather(client_task, return_exceptions=True)
+        if self.client.ws is not None:
+            await self.client.ws.close(code=1000)
 
     async def fetch_and_save_channels(self):
         """
@@ -77,134 +450,163 @@ class DiscordExporter:
         """
         await self.client.wait_until_ready()
 
-        channels_data = []
+        # 推定メッセージ数の計算基準時刻（全チャンネル共通）
+        now_utc = datetime.now(timezone.utc)
 
         print("🔍 チャンネル情報を取得中...")
 
+        # 同時に実行する履歴取得の上限（Discordのレート制限を考慮）
+        PROBE_CONCURRENCY = 32
+
+        # 全サーバーのチャンネルを一つのキューにまとめる
+        queue = asyncio.Queue()
         for guild in self.client.guilds:
             print(f"サーバー: {guild.name}")
 
             for channel in guild.channels:
                 # メッセージ履歴を持つチャンネルのみ対象
                 if hasattr(channel, "history"):
-                    try:
-                        # メッセージ数を推定（最新10件から推定）
-                        recent_messages = []
-                        # 型チェック対応
-                        from typing import cast
-                        import discord
-                        messageable_channel = cast(discord.abc.Messageable, channel)
-                        
-                        print(f"  チャンネル {channel.name} のメッセージを取得中...")
-                        try:
-                            async for message in messageable_channel.history(limit=10):
-                                try:
-                                    # メッセージの基本情報をデバッグ出力
-                                    # print(f"    メッセージID: {message.id} (type: {type(message.id)})")
-                                    # print(f"    created_at: {message.created_at} (type: {type(message.created_at)})")
-                                    
-                                    # created_atが正しいdatetimeオブジェクトかどうかチェック
-                                    if not hasattr(message.created_at, 'year'):
-                                        # print(f"    警告: created_atが正しいdatetimeオブジェクトではありません")
-                                        continue
-                                    
-                                    recent_messages.append(message)
-                                except Exception as msg_error:
-                                    # print(f"    メッセージ処理エラー: {msg_error}")
-                                    continue
-                        except Exception as history_error:
-                            # print(f"  メッセージ履歴取得エラー: {history_error}")
-                            estimated_messages = 0
-                            continue
-
-                        # 推定総メッセージ数（簡易計算）
-                        # print(f"  取得したメッセージ数: {len(recent_messages)}")
-                        if recent_messages and len(recent_messages) > 0:
-                            # print(f"  メッセージの日付比較を開始...")
-                            try:
-                                # 比較前に各メッセージの日付をチェック
-                                # for i, msg in enumerate(recent_messages):
-                                #     print(f"    メッセージ{i}: {msg.created_at} (type: {type(msg.created_at)})")
-                                
-                                oldest_message = min(
-                                    recent_messages, key=lambda m: m.created_at
-                                )
-                                newest_message = max(
-                                    recent_messages, key=lambda m: m.created_at
-                                )
-                                # print(f"  最旧: {oldest_message.created_at}, 最新: {newest_message.created_at}")
-                            except (TypeError, ValueError) as e:
-                                # print(f"  メッセージ比較エラー: {e}")
-                                # print(f"  エラー詳細: recent_messagesの型 = {type(recent_messages)}")
-                                # for i, msg in enumerate(recent_messages):
-                                #     print(f"    エラーメッセージ{i}: id={msg.id}, created_at={msg.created_at} (type: {type(msg.created_at)})")
-                                estimated_messages = len(recent_messages)
-                            else:
-                                # 正常に比較できた場合の処理
-                                if len(recent_messages) >= 10:
-                                    time_diff = (
-                                        newest_message.created_at
-                                        - oldest_message.created_at
-                                    ).total_seconds()
-                                    if time_diff > 0:
-                                        messages_per_second = (
-                                            len(recent_messages) / time_diff
-                                        )
-                                        channel_age = (
-                                            datetime.now(timezone.utc) - channel.created_at
-                                        ).total_seconds()
-                                        estimated_messages = int(
-                                            messages_per_second * channel_age
-                                        )
-                                    else:
-                                        estimated_messages = len(recent_messages)
-                                else:
-                                    estimated_messages = len(recent_messages)
-                        else:
-                            estimated_messages = 0
+                    queue.put_nowait((queue.qsize(), guild, channel))
 
-                        # カテゴリー情報を取得
-                        category_name = None
-                        if hasattr(channel, 'category') and channel.category:
-                            category_name = channel.category.name
-                        
-                        channels_data.append(
-                            {
-                                "guild_name": guild.name,
-                                "guild_id": guild.id,
-                                "channel_name": channel.name,
-                                "channel_id": channel.id,
-                                "channel_type": str(channel.type),
-                                "category_name": category_name,
-                                "estimated_messages": estimated_messages,
-                                "created_at": channel.created_at.isoformat(),
-                            }
-                        )
+        results = [None] * queue.qsize()
 
-                        print(
-                            f"  #{channel.name} (推定メッセージ数: {estimated_messages})"
-                        )
+        async def worker():
+            while True:
+                try:
+                    index, guild, channel = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[index] = await self._probe_channel(guild, channel, now_utc)
+
+        # 全チャンネルの履歴取得を並行実行
+        worker_count = min(PROBE_CONCURRENCY, len(results))
+        if hasattr(asyncio, "TaskGroup"):
+            # Python 3.11+: 構造化並行性（中断時に残りのワーカーも確実にキャンセル）
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(worker_count):
+                    task_group.create_task(worker())
+        else:
+            await asyncio.gather(*(worker() for _ in range(worker_count)))
+        channels_data = [result for result in results if result is not None]
 
-                    except Exception as e:
-                        print(f"  #{channel.name} - エラー: {e}")
-                        continue
+        # JSONファイルに保存（書き込み途中で中断されても既存ファイルを壊さないよう一時ファイル経由）
+        data = json_dumps(channels_data)
 
-        # JSONファイルに保存
-        with open(self.channels_file, "w", encoding="utf-8") as f:
-            json.dump(channels_data, f, ensure_ascii=False, indent=2)
+        tmp_file = self.channels_file + ".tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                f.write(data)
+            os.replace(tmp_file, self.channels_file)
+        except Exception:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
 
         print(f"✅ チャンネル情報を {self.channels_file} に保存しました")
-        await self.client.close()
+        if not self._logged_in:
+            await self.client.close()
         return True
 
+    async def _probe_channel(self, guild, channel, now_utc):
+        """
+        チャンネルの最新メッセージを取得して推定メッセージ数を含む情報を返す
+        """
+        try:
+            # 型チェック対応
+            from typing import cast
+            import discord
+            messageable_channel = cast(discord.abc.Messageable, channel)
+
+            logger.debug("チャンネル %s のメッセージを取得中...", channel.name)
+            try:
+                # メッセージ数を推定（最新10件の投稿日時から推定）
+                recent_timestamps = await self._fetch_recent_timestamps(
+                    messageable_channel
+                )
+            except Exception as history_error:
+                logger.debug("チャンネル %s のメッセージ履歴取得エラー: %s", channel.name, history_error)
+                return None
+
+            # 推定総メッセージ数（簡易計算）
+            estimated_messages = self._estimate_message_count(
+                recent_timestamps, channel.created_at, now_utc
+            )
+
+            # カテゴリー情報を取得
+            category_name = None
+            if hasattr(channel, 'category') and channel.category:
+                category_name = channel.category.name
+
+            print(
+                f"  #{channel.name} (推定メッセージ数: {estimated_messages})"
+            )
+
+            return {
+                "guild_name": guild.name,
+                "guild_id": guild.id,
+                "channel_name": channel.name,
+                "channel_id": channel.id,
+                "channel_type": str(channel.type),
+                "category_name": category_name,
+                "estimated_messages": estimated_messages,
+                "created_at": channel.created_at.isoformat(),
+            }
+
+        except Exception as e:
+            print(f"  #{channel.name} - エラー: {e}")
+            return None
+
+    async def _fetch_recent_timestamps(self, channel, limit=10):
+        """
+        チャンネルの最新メッセージの投稿日時を取得
+        レート制限(429)やサーバーエラー時の待機・再試行はdiscord.pyのHTTPクライアントが行う
+        """
+        recent_timestamps = []
+        async for message in channel.history(limit=limit):
+            # created_atが正しいdatetimeオブジェクトかどうかチェック
+            if not hasattr(message.created_at, 'year'):
+                continue
+
+            recent_timestamps.append(message.created_at)
+        return recent_timestamps
+
+    @staticmethod
+    def _estimate_message_count(
+        timestamps, channel_created_at, now_utc, sample_size=10
+    ):
+        """
+        最新メッセージの投稿日時からチャンネルの総メッセージ数を推定
+        """
+        count = len(timestamps)
+        if count < sample_size:
+            return count
+
+        try:
+            time_diff = (max(timestamps) - min(timestamps)).total_seconds()
+        except (TypeError, ValueError):
+            return count
+
+        if time_diff <= 0:
+            return count
+
+        channel_age = (now_utc - channel_created_at).total_seconds()
+        return int(count / time_diff * channel_age)
+
     def load_channels(self):
         """
         保存されたチャンネル情報を読み込み
         """
-        if os.path.exists(self.channels_file):
-            with open(self.channels_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return []
+        if not os.path.exists(self.channels_file):
+            return []
+
+        with open(self.channels_file, "rb") as f:
+            channels = json_loads(f.read())
+
+        # カテゴリー名と推定メッセージ数は読み込み時に一度だけ正規化する
+        for channel in channels:
+            channel["category_name"] = channel.get("category_name") or UNCATEGORIZED
+            channel.setdefault("estimated_messages", 0)
+        return channels
 
     def select_channels_interactive(self, use_tui=True):
         """
@@ -227,9 +629,9 @@ class DiscordExporter:
         """
         TUI（Terminal User Interface）でチェックボックス形式のチャンネル選択
         """
-        console = Console()
+        console = CONSOLE
         
-        total_estimated = sum(channel.get("estimated_messages", 0) for channel in channels)
+        total_estimated = sum(channel["estimated_messages"] for channel in channels)
         
         # まず統計情報を表示
         console.print("\n" + "="*80)
@@ -250,30 +652,31 @@ class DiscordExporter:
             console.print("")
             console.print("[dim]y: 継続 | N: 中止 | s: 今後この警告を表示しない[/dim]")
 
-            # 一文字入力での確認
-            while True:
-                try:
-                    response = get_single_key_input("続行しますか？ (y/N/s): ")
-                    if response in ['y']:
-                        print("y")
-                        break
-                    elif response in ['s']:
-                        print("s")
-                        console.print("[yellow]今後この警告を表示しないように設定しました。[/yellow]")
-                        # 設定を更新
-                        config["show_message_count_warning"] = False
-                        self.save_config(config)
-                        break
-                    elif response in ['n', '\n', '\r', '\x1b']:  # n, Enter, ESC
-                        print("n" if response == 'n' else "")
+            # 一文字入力での確認（プロンプト中はcbreakモードを維持）
+            with raw_tty():
+                while True:
+                    try:
+                        response = get_single_key_input("続行しますか？ (y/N/s): ")
+                        if response in ['y']:
+                            print("y")
+                            break
+                        elif response in ['s']:
+                            print("s")
+                            console.print("[yellow]今後この警告を表示しないように設定しました。[/yellow]")
+                            # 設定を更新
+                            config["show_message_count_warning"] = False
+                            self.save_config(config)
+                            break
+                        elif response in ['n', '\n', '\r', '\x1b']:  # n, Enter, ESC
+                            print("n" if response == 'n' else "")
+                            console.print("[red]処理を中止しました。[/red]")
+                            return []
+                        # その他のキーは無視して再入力待ち
+                        print(f"\r続行しますか？ (y/N/s): ", end="", flush=True)
+                    except (KeyboardInterrupt, EOFError):
+                        print("\n")
                         console.print("[red]処理を中止しました。[/red]")
                         return []
-                    # その他のキーは無視して再入力待ち
-                    print(f"\r続行しますか？ (y/N/s): ", end="", flush=True)
-                except (KeyboardInterrupt, EOFError):
-                    print("\n")
-                    console.print("[red]処理を中止しました。[/red]")
-                    return []
 
         # チェックボックス形式のTUIを起動
         try:
@@ -298,21 +701,19 @@ class DiscordExporter:
         
         categories = defaultdict(list)
         
+        # category_nameは load_channels() で正規化済み
         for channel in channels:
-            category_name = channel.get('category_name', None)
-            if category_name is None:
-                category_name = "未分類"
-            categories[category_name].append(channel)
+            categories[channel["category_name"]].append(channel)
         
         # カテゴリーをソート（未分類を最後に）
         sorted_categories = []
         for category_name in sorted(categories.keys()):
-            if category_name != "未分類":
+            if category_name != UNCATEGORIZED:
                 sorted_categories.append((category_name, categories[category_name]))
         
         # 未分類を最後に追加
-        if "未分類" in categories:
-            sorted_categories.append(("未分類", categories["未分類"]))
+        if UNCATEGORIZED in categories:
+            sorted_categories.append((UNCATEGORIZED, categories[UNCATEGORIZED]))
         
         return sorted_categories
 
@@ -320,9 +721,15 @@ class DiscordExporter:
         """
         カテゴリー別表示用のリストを作成
         """
+        import numpy as np
+
         categories = self._organize_channels_by_category(channels)
         display_items = []
         channel_map = {}  # display_index -> channel_index
+        category_indices = {}  # category_name -> np.ndarray[channel_index]
+        
+        # チャンネル -> インデックスの対応表（channels.index() の線形探索を避ける）
+        channel_index = {id(channel): i for i, channel in enumerate(channels)}
         
         for category_name, category_channels in categories:
             # カテゴリーヘッダーを追加
@@ -331,30 +738,43 @@ class DiscordExporter:
                 "text": f"📁 {category_name}",
                 "category_name": category_name
             })
+            category_indices[category_name] = []
             
             # カテゴリー内のチャンネルを追加
             for channel in category_channels:
-                original_index = channels.index(channel)
+                original_index = channel_index[id(channel)]
+                category_indices[category_name].append(original_index)
                 display_index = len(display_items)
                 
-                estimated = channel.get("estimated_messages", 0)
-                text = f"  ☐ #{channel['channel_name']} ({estimated:,})"
+                estimated = channel["estimated_messages"]
+                label = f"#{channel['channel_name']} ({estimated:,})"
                 
+                # チェック状態毎の表示テキストを事前に作成しておく
                 display_items.append({
                     "type": "channel",
-                    "text": text,
+                    "text": f"  ☐ {label}",
+                    "checked_text": f"  ☑ {label}",
                     "channel": channel,
+                    "category_name": category_name,
                     "original_index": original_index
                 })
                 
                 channel_map[display_index] = original_index
         
-        return display_items, channel_map
+        # チェック状態配列をまとめて更新できるようにインデックス配列へ変換
+        category_indices = {
+            name: np.asarray(indices, dtype=np.intp)
+            for name, indices in category_indices.items()
+        }
+        
+        return display_items, channel_map, category_indices
 
     def _checkbox_ui(self, stdscr, channels):
         """
         cursesを使用したチェックボックスUI（カテゴリー別表示対応）
         """
+        import numpy as np
+
         curses.curs_set(0)  # カーソルを非表示
         stdscr.keypad(1)    # 特殊キーを有効化
         
@@ -366,8 +786,15 @@ class DiscordExporter:
         curses.init_pair(4, curses.COLOR_RED, curses.COLOR_BLACK)    # 警告
         curses.init_pair(5, curses.COLOR_CYAN, curses.COLOR_BLACK)   # カテゴリー
         
+        # 描画ループで使う属性値を一度だけ解決しておく
+        attr_selected = curses.color_pair(1) | curses.A_BOLD
+        attr_checked = curses.color_pair(2)
+        attr_header = curses.color_pair(3)
+        attr_warning = curses.color_pair(4)
+        attr_category = curses.color_pair(5) | curses.A_BOLD
+        
         # カテゴリー別表示リストを作成
-        display_items, channel_map = self._create_display_list(channels)
+        display_items, channel_map, category_indices = self._create_display_list(channels)
         
         # ページング設定
         ITEMS_PER_PAGE = 15
@@ -375,42 +802,57 @@ class DiscordExporter:
         current_pos = 0
         current_page = 0
         
-        # ページ数計算
-        remaining_items = len(display_items) - FIRST_PAGE_ITEMS
-        if remaining_items <= 0:
-            total_pages = 1
-        else:
-            total_pages = 1 + ((remaining_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
+        # ページ毎の表示範囲を事前計算: (開始, 終了, ページ内の選択可能位置数)
+        pages = [(0, min(FIRST_PAGE_ITEMS, len(display_items)))]
+        for start in range(FIRST_PAGE_ITEMS, len(display_items), ITEMS_PER_PAGE):
+            pages.append((start, min(start + ITEMS_PER_PAGE, len(display_items))))
+        # 1ページ目はAllオプションの分だけ選択位置が多い
+        pages = [
+            (start, end, end - start + (1 if page == 0 else 0))
+            for page, (start, end) in enumerate(pages)
+        ]
+        total_pages = len(pages)
         
         # チェック状態を管理
-        checked = [False] * len(channels)
+        checked = np.zeros(len(channels), dtype=np.bool_)
         all_checked = False
         
+        # 選択数はトグル時のみ更新し、描画時は再計算しない
+        selected_count = 0
+        category_selected = dict.fromkeys(category_indices, 0)
+        
+        # 画面幅に合わせて切り詰めた表示テキストのキャッシュ（幅が変わった時のみ破棄）
+        fitted_texts = {}
+        fitted_width = None
+        
+        # 固定文字列とその表示幅（全角文字は2セル）は一度だけ計算する
+        title = "Discord チャンネル選択"
+        title_width = cell_len(title)
+        help_text = "↑↓/jk: 移動 | SPACE: チェック/カテゴリ選択 | A: 全選択/解除 | ENTER: 確定 | Q: キャンセル | ←→/hl: ページ移動"
+        help_width = cell_len(help_text)
+        
         while True:
-            stdscr.clear()
+            # clear()は端末全体の再描画を強制するため、erase()で差分のみ出力させる
+            stdscr.erase()
             height, width = stdscr.getmaxyx()
+            if width != fitted_width:
+                fitted_texts.clear()
+                fitted_width = width
             
             # ヘッダー情報
-            title = "Discord チャンネル選択"
-            stdscr.addstr(0, (width - len(title)) // 2, title, curses.color_pair(3) | curses.A_BOLD)
+            stdscr.addstr(0, max((width - title_width) // 2, 0), title, attr_header | curses.A_BOLD)
             
-            page_info = f"ページ {current_page + 1}/{total_pages} | 選択済み: {sum(checked)}/{len(channels)}"
-            stdscr.addstr(1, (width - len(page_info)) // 2, page_info, curses.color_pair(3))
+            page_info = f"ページ {current_page + 1}/{total_pages} | 選択済み: {selected_count}/{len(channels)}"
+            stdscr.addstr(1, max((width - cell_len(page_info)) // 2, 0), page_info, attr_header)
             
             # 操作説明
-            help_text = "↑↓/jk: 移動 | SPACE: チェック/カテゴリ選択 | A: 全選択/解除 | ENTER: 確定 | Q: キャンセル | ←→/hl: ページ移動"
-            if len(help_text) < width:
-                stdscr.addstr(2, (width - len(help_text)) // 2, help_text)
+            if help_width < width:
+                stdscr.addstr(2, (width - help_width) // 2, help_text)
             
             stdscr.addstr(3, 0, "="*min(width-1, 80))
             
-            # 現在ページの表示範囲を計算
-            if current_page == 0:
-                start_idx = 0
-                end_idx = min(FIRST_PAGE_ITEMS, len(display_items))
-            else:
-                start_idx = FIRST_PAGE_ITEMS + (current_page - 1) * ITEMS_PER_PAGE
-                end_idx = min(start_idx + ITEMS_PER_PAGE, len(display_items))
+            # 現在ページの表示範囲
+            start_idx, end_idx, _ = pages[current_page]
             
             y_offset = 5
             
@@ -420,13 +862,13 @@ class DiscordExporter:
                 all_text = f"{all_symbol} All ({len(channels)} channels)"
                 
                 if current_pos == 0:
-                    stdscr.addstr(y_offset, 2, all_text, curses.color_pair(1) | curses.A_BOLD)
+                    stdscr.addstr(y_offset, 2, all_text, attr_selected)
                 else:
-                    stdscr.addstr(y_offset, 2, all_text, curses.color_pair(2) if all_checked else 0)
+                    stdscr.addstr(y_offset, 2, all_text, attr_checked if all_checked else 0)
                 y_offset += 1
                 
                 # 区切り線
-                stdscr.addstr(y_offset, 2, "-" * min(width-4, 40), curses.color_pair(3))
+                stdscr.addstr(y_offset, 2, "-" * min(width-4, 40), attr_header)
                 y_offset += 2
             
             # 表示アイテム一覧（カテゴリー + チャンネル）
@@ -452,14 +894,8 @@ class DiscordExporter:
                     category_name = item["category_name"]
                     
                     # カテゴリ内のチャンネル選択状態を確認
-                    category_channels = [ch for ch in channels if ch.get('category_name', '未分類') == category_name]
-                    selected_in_category = 0
-                    try:
-                        selected_in_category = sum(1 for ch in category_channels if checked[channels.index(ch)])
-                    except (ValueError, IndexError):
-                        # インデックスが見つからない場合は0として継続
-                        selected_in_category = 0
-                    total_in_category = len(category_channels)
+                    selected_in_category = category_selected[category_name]
+                    total_in_category = len(category_indices[category_name])
                     
                     # カテゴリーヘッダーの表示テキストを作成
                     if selected_in_category == total_in_category:
@@ -473,9 +909,9 @@ class DiscordExporter:
                     
                     # ハイライト表示
                     if is_selected:
-                        stdscr.addstr(y_offset, 0, display_text, curses.color_pair(1) | curses.A_BOLD)
+                        stdscr.addstr(y_offset, 0, display_text, attr_selected)
                     else:
-                        color = curses.color_pair(2) if selected_in_category > 0 else curses.color_pair(5) | curses.A_BOLD
+                        color = attr_checked if selected_in_category > 0 else attr_category
                         stdscr.addstr(y_offset, 0, display_text, color)
                     
                     y_offset += 1
@@ -483,18 +919,20 @@ class DiscordExporter:
                 elif item["type"] == "channel":
                     # チャンネル（選択可能）
                     original_idx = item["original_index"]
-                    symbol = "☑" if checked[original_idx] else "☐"
-                    text = item["text"].replace("☐", symbol)
+                    text = item["checked_text"] if checked[original_idx] else item["text"]
                     
                     # 画面幅に合わせてカット
-                    if len(text) > width - 4:
-                        text = text[:width-7] + "..."
+                    fitted = fitted_texts.get(text)
+                    if fitted is None:
+                        fitted = fit_to_width(text, width - 4)
+                        fitted_texts[text] = fitted
+                    text = fitted
                     
                     # ハイライト表示
                     if is_selected:
-                        stdscr.addstr(y_offset, 0, text, curses.color_pair(1) | curses.A_BOLD)
+                        stdscr.addstr(y_offset, 0, text, attr_selected)
                     else:
-                        color = curses.color_pair(2) if checked[original_idx] else 0
+                        color = attr_checked if checked[original_idx] else 0
                         stdscr.addstr(y_offset, 0, text, color)
                     
                     y_offset += 1
@@ -506,44 +944,50 @@ class DiscordExporter:
                     break
             
             # フッター
-            footer = f"選択中: {sum(checked)} チャンネル"
+            footer = f"選択中: {selected_count} チャンネル"
             if current_page < total_pages - 1:
                 footer += " | 次ページ: →"
             if current_page > 0:
                 footer += " | 前ページ: ←"
             
-            stdscr.addstr(height-1, 0, footer[:width-1], curses.color_pair(3))
+            stdscr.addstr(height-1, 0, fit_to_width(footer, width-1), attr_header)
             
-            stdscr.refresh()
+            stdscr.noutrefresh()
+            curses.doupdate()
             
             # キー入力処理
             key = stdscr.getch()
             
-            if key == ord('q') or key == ord('Q'):
+            if key == curses.KEY_RESIZE:
+                # 端末サイズ変更時のみ画面全体を再描画
+                stdscr.clear()
+                continue
+            
+            elif key == ord('q') or key == ord('Q'):
                 return None  # キャンセル
             
             elif key == ord('\n') or key == 10:  # Enter
-                if sum(checked) == 0:
+                if selected_count == 0:
                     # 何も選択されていない場合のメッセージ
-                    stdscr.addstr(height-2, 0, "少なくとも1つのチャンネルを選択してください", curses.color_pair(4))
+                    stdscr.addstr(height-2, 0, "少なくとも1つのチャンネルを選択してください", attr_warning)
                     stdscr.refresh()
                     stdscr.getch()
                     continue
-                return [i for i, c in enumerate(checked) if c]
+                return np.flatnonzero(checked).tolist()
             
             elif key == ord(' '):  # スペースキー
                 if current_page == 0 and current_pos == 0:
                     # "All"を切り替え
                     all_checked = not all_checked
-                    checked = [all_checked] * len(channels)
+                    checked[:] = all_checked
+                    selected_count = len(channels) if all_checked else 0
+                    category_selected = {
+                        name: len(indices) if all_checked else 0
+                        for name, indices in category_indices.items()
+                    }
                 else:
                     # 現在の表示範囲を取得
-                    if current_page == 0:
-                        start_idx = 0
-                        end_idx = min(FIRST_PAGE_ITEMS, len(display_items))
-                    else:
-                        start_idx = FIRST_PAGE_ITEMS + (current_page - 1) * ITEMS_PER_PAGE
-                        end_idx = min(start_idx + ITEMS_PER_PAGE, len(display_items))
+                    start_idx, end_idx, _ = pages[current_page]
                     
                     # 現在選択されているアイテムを見つける
                     display_pos = 0  # 表示アイテムの位置カウンター
@@ -565,29 +1009,26 @@ class DiscordExporter:
                             if item["type"] == "category_header":
                                 # カテゴリー選択：そのカテゴリ内の全チャンネルを切り替え
                                 category_name = item["category_name"]
-                                category_channels = [ch for ch in channels if ch.get('category_name', '未分類') == category_name]
+                                indices = category_indices[category_name]
                                 
-                                # カテゴリ内の選択状態を確認
-                                try:
-                                    category_indices = [channels.index(ch) for ch in category_channels]
-                                    selected_in_category = sum(1 for idx in category_indices if checked[idx])
-                                except (ValueError, IndexError):
-                                    # インデックスが見つからない場合はスキップ
-                                    break
-                                else:
-                                    # 全選択なら全解除、そうでなければ全選択
-                                    new_state = selected_in_category < len(category_channels)
-                                    for idx in category_indices:
-                                        checked[idx] = new_state
+                                # 全選択なら全解除、そうでなければ全選択
+                                new_state = category_selected[category_name] < len(indices)
+                                checked[indices] = new_state
                                 
-                                all_checked = all(checked)
+                                new_count = len(indices) if new_state else 0
+                                selected_count += new_count - category_selected[category_name]
+                                category_selected[category_name] = new_count
+                                all_checked = selected_count == len(channels)
                                 break
                                 
                             elif item["type"] == "channel":
                                 # 個別チャンネルを切り替え
                                 original_idx = item["original_index"]
                                 checked[original_idx] = not checked[original_idx]
-                                all_checked = all(checked)
+                                delta = 1 if checked[original_idx] else -1
+                                selected_count += delta
+                                category_selected[item["category_name"]] += delta
+                                all_checked = selected_count == len(channels)
                                 break
                         
                         display_pos += 1
@@ -595,7 +1036,12 @@ class DiscordExporter:
             elif key == ord('a') or key == ord('A'):
                 # 全選択/全解除切り替え
                 all_checked = not all_checked
-                checked = [all_checked] * len(channels)
+                checked[:] = all_checked
+                selected_count = len(channels) if all_checked else 0
+                category_selected = {
+                    name: len(indices) if all_checked else 0
+                    for name, indices in category_indices.items()
+                }
             
             elif key == curses.KEY_UP or key == ord('k') or key == ord('K'):
                 if current_pos > 0:
@@ -603,34 +1049,11 @@ class DiscordExporter:
                 elif current_page > 0:
                     current_page -= 1
                     # 前ページの最後の項目に移動
-                    if current_page == 0:
-                        # 1ページ目の場合：Allオプション + 全アイテム
-                        search_start = 0
-                        search_end = min(FIRST_PAGE_ITEMS, len(display_items))
-                        item_count = search_end - search_start
-                        current_pos = item_count  # Allオプション(0) + 全アイテム数
-                    else:
-                        # 2ページ目以降の場合
-                        search_start = FIRST_PAGE_ITEMS + (current_page - 1) * ITEMS_PER_PAGE
-                        search_end = min(search_start + ITEMS_PER_PAGE, len(display_items))
-                        item_count = search_end - search_start
-                        current_pos = item_count - 1
+                    current_pos = pages[current_page][2] - 1
             
             elif key == curses.KEY_DOWN or key == ord('j') or key == ord('J'):
-                # 現在ページでのアイテム数を計算（カテゴリー + チャンネル）
-                if current_page == 0:
-                    search_start = 0
-                    search_end = min(FIRST_PAGE_ITEMS, len(display_items))
-                else:
-                    search_start = FIRST_PAGE_ITEMS + (current_page - 1) * ITEMS_PER_PAGE
-                    search_end = min(search_start + ITEMS_PER_PAGE, len(display_items))
-                
-                # ページ内の全アイテム数をカウント
-                item_count = search_end - search_start
-                
-                max_pos_on_page = item_count
-                if current_page == 0:
-                    max_pos_on_page += 1  # Allオプションの分を追加
+                # 現在ページでの選択可能位置数（All + カテゴリー + チャンネル）
+                max_pos_on_page = pages[current_page][2]
                 
                 if current_pos < max_pos_on_page - 1:
                     current_pos += 1
@@ -669,11 +1092,13 @@ class DiscordExporter:
             
             # ページ内のチャンネルを表示
             choices = []
+            lines = []
             for i, channel in enumerate(page_channels):
-                estimated = channel.get("estimated_messages", 0)
+                estimated = channel["estimated_messages"]
                 display_name = f"[{channel['guild_name']}] #{channel['channel_name']} (推定: {estimated:,} メッセージ)"
                 choices.append((display_name, start_idx + i))
-                console.print(f"  {start_idx + i + 1:2d}. {display_name}")
+                lines.append(f"  {start_idx + i + 1:2d}. {display_name}")
+            console.print("\n".join(lines))
             
             # このページでの選択
             console.print(f"\nページ {page + 1} での選択:")
@@ -727,24 +1152,29 @@ class DiscordExporter:
         """
         シンプルなチャンネル選択（少数の場合）
         """
-        # チャンネル一覧を表示
-        table = Table(show_header=True, header_style="bold magenta")
-        table.add_column("No.", style="dim", width=4)
-        table.add_column("サーバー", style="cyan")
-        table.add_column("チャンネル", style="green")
-        table.add_column("推定メッセージ数", justify="right", style="yellow")
-
-        for i, channel in enumerate(channels, 1):
-            estimated = channel.get("estimated_messages", 0)
-            table.add_row(
-                str(i),
-                channel['guild_name'],
-                f"#{channel['channel_name']}",
-                f"{estimated:,}"
+        # チャンネル一覧を表示（固定列のためTableを使わず文字列で整形）
+        guild_names = [channel['guild_name'] for channel in channels]
+        channel_names = [f"#{channel['channel_name']}" for channel in channels]
+        guild_width = max(map(cell_len, guild_names + ["サーバー"]))
+        channel_width = max(map(cell_len, channel_names + ["チャンネル"]))
+        count_header = "推定メッセージ数"
+        count_width = cell_len(count_header)
+
+        lines = [
+            "\n📋 利用可能なチャンネル:",
+            f"[bold magenta]{'No.':<4} {set_cell_size('サーバー', guild_width)} "
+            f"{set_cell_size('チャンネル', channel_width)} {count_header}[/bold magenta]",
+        ]
+        for i, channel in enumerate(channels):
+            estimated = channel["estimated_messages"]
+            lines.append(
+                f"[dim]{i + 1:<4}[/dim] "
+                f"[cyan]{escape(set_cell_size(guild_names[i], guild_width))}[/cyan] "
+                f"[green]{escape(set_cell_size(channel_names[i], channel_width))}[/green] "
+                f"[yellow]{estimated:>{count_width},}[/yellow]"
             )
 
-        console.print("\n📋 利用可能なチャンネル:")
-        console.print(table)
+        console.print("\n".join(lines))
         
         console.print("\n🎯 エクスポートしたいチャンネルを選択してください:")
         print("選択方法:")
@@ -778,27 +1208,19 @@ class DiscordExporter:
         """
         選択文字列を解析してインデックスリストを返す
         """
-        selected_indices = []
+        # 入力順を保ったまま重複を除く（範囲チェックも解析中に行う）
+        selected_indices = {}
         
         for part in selection.split(','):
-            part = part.strip()
-            if '-' in part:
-                try:
-                    start, end = map(int, part.split('-'))
-                    selected_indices.extend(range(start-1, end))
-                except ValueError:
-                    return None
-            else:
-                try:
-                    selected_indices.append(int(part) - 1)
-                except ValueError:
-                    return None
-        
-        # 重複削除と範囲チェック
-        selected_indices = list(set(selected_indices))
-        selected_indices = [i for i in selected_indices if 0 <= i < max_count]
+            match = SELECTION_PATTERN.match(part)
+            if match is None:
+                return None
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else start
+            for i in range(max(start - 1, 0), min(end, max_count)):
+                selected_indices[i] = None
         
-        return selected_indices if selected_indices else None
+        return list(selected_indices) or None
 
     def _finalize_selection(self, selected_channels, console):
         """
@@ -808,18 +1230,19 @@ class DiscordExporter:
             console.print("[red]チャンネルが選択されていません。[/red]")
             return []
 
-        # 結果表示
-        console.print(f"\n✅ [bold green]{len(selected_channels)} チャンネルを選択しました:[/bold green]")
+        # 結果表示（行をまとめて一度に出力）
+        lines = [f"\n✅ [bold green]{len(selected_channels)} チャンネルを選択しました:[/bold green]"]
         selected_total = 0
         for channel in selected_channels:
-            estimated = channel.get("estimated_messages", 0)
+            estimated = channel["estimated_messages"]
             selected_total += estimated
-            console.print(
+            lines.append(
                 f"   - [{channel['guild_name']}] #{channel['channel_name']} "
                 f"(推定: {estimated:,} メッセージ)"
             )
 
-        console.print(f"\n選択チャンネルの総推定メッセージ数: [bold yellow]{selected_total:,}[/bold yellow]")
+        lines.append(f"\n選択チャンネルの総推定メッセージ数: [bold yellow]{selected_total:,}[/bold yellow]")
+        console.print("\n".join(lines))
 
         return selected_channels
 
@@ -827,20 +1250,21 @@ class DiscordExporter:
         """
         従来のCLIでチャンネル選択
         """
-        print("\n📋 利用可能なチャンネル:")
-        print("=" * 80)
-
-        total_estimated = 0
-        for i, channel in enumerate(channels, 1):
-            estimated = channel.get("estimated_messages", 0)
-            total_estimated += estimated
-            print(
-                f"{i:2d}. [{channel['guild_name']}] #{channel['channel_name']} "
-                f"(推定: {estimated:,} メッセージ)"
-            )
+        lines = ["\n📋 利用可能なチャンネル:", "=" * 80]
+
+        # 行の表示文字列は一度だけ作り、選択結果の表示でも使い回す
+        estimates = [channel["estimated_messages"] for channel in channels]
+        rows = [
+            f"[{channel['guild_name']}] #{channel['channel_name']} "
+            f"(推定: {estimated:,} メッセージ)"
+            for channel, estimated in zip(channels, estimates)
+        ]
+        total_estimated = sum(estimates)
+        lines.extend(f"{i:2d}. {row}" for i, row in enumerate(rows, 1))
 
-        print("=" * 80)
-        print(f"総推定メッセージ数: {total_estimated:,}")
+        lines.append("=" * 80)
+        lines.append(f"総推定メッセージ数: {total_estimated:,}")
+        print("\n".join(lines))
 
         # 警告表示
         if total_estimated > 50000:
@@ -860,51 +1284,40 @@ class DiscordExporter:
         print("   - 'all' で全選択")
 
         while True:
-            try:
-                selection = input("\n選択: ").strip()
+            selection = input("\n選択: ").strip()
 
-                if selection.lower() == "all":
-                    selected_channels = channels[:]
-                    break
-
-                selected_indices = []
+            if selection.lower() == "all":
+                selected_indices = range(len(channels))
+                break
 
-                for part in selection.split(","):
-                    part = part.strip()
-                    if "-" in part:
-                        start, end = map(int, part.split("-"))
-                        selected_indices.extend(range(start - 1, end))
-                    else:
-                        selected_indices.append(int(part) - 1)
+            # 入力順を保ったまま重複を除く（範囲チェックも解析中に行う）
+            selected_indices = {}
 
-                # 重複削除と範囲チェック
-                selected_indices = list(set(selected_indices))
-                selected_indices = [
-                    i for i in selected_indices if 0 <= i < len(channels)
-                ]
+            for part in selection.split(","):
+                match = SELECTION_PATTERN.match(part)
+                if match is None:
+                    print("❌ 無効な入力です。数字とカンマ、ハイフンのみ使用してください。")
+                    break
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else start
+                for i in range(max(start - 1, 0), min(end, len(channels))):
+                    selected_indices[i] = None
+            else:
+                selected_indices = list(selected_indices)
 
                 if not selected_indices:
                     print("❌ 有効な選択がありません。")
                     continue
 
-                selected_channels = [channels[i] for i in selected_indices]
                 break
 
-            except ValueError:
-                print("❌ 無効な入力です。数字とカンマ、ハイフンのみ使用してください。")
-                continue
+        selected_channels = [channels[i] for i in selected_indices]
+        selected_total = sum(estimates[i] for i in selected_indices)
+        lines = [f"\n✅ {len(selected_channels)} チャンネルを選択しました:"]
+        lines.extend(f"   - {rows[i]}" for i in selected_indices)
 
-        print(f"\n✅ {len(selected_channels)} チャンネルを選択しました:")
-        selected_total = 0
-        for channel in selected_channels:
-            estimated = channel.get("estimated_messages", 0)
-            selected_total += estimated
-            print(
-                f"   - [{channel['guild_name']}] #{channel['channel_name']} "
-                f"(推定: {estimated:,} メッセージ)"
-            )
-
-        print(f"\n選択チャンネルの総推定メッセージ数: {selected_total:,}")
+        lines.append(f"\n選択チャンネルの総推定メッセージ数: {selected_total:,}")
+        print("\n".join(lines))
 
         return selected_channels
 
@@ -912,17 +1325,32 @@ class DiscordExporter:
         """
         設定をJSONファイルに保存
         """
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        with open(self.config_file, 'wb') as f:
+            f.write(json_dumps(config))
+
+        # 保存した内容でキャッシュを更新
+        self._config_cache = dict(config)
+        self._config_mtime = os.stat(self.config_file).st_mtime_ns
 
     def load_config(self):
         """
         設定をJSONファイルから読み込み
+        ファイルが更新されていなければキャッシュを返す
         """
-        if os.path.exists(self.config_file):
+        try:
+            mtime = os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if mtime is not None:
+            if self._config_cache is not None and mtime == self._config_mtime:
+                return dict(self._config_cache)
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    config = json_loads(f.read())
+                self._config_cache = config
+                self._config_mtime = mtime
+                return dict(config)
             except Exception:
                 pass
         
@@ -940,22 +1368,31 @@ class DiscordExporter:
     def get_channels_info(self):
         """
         チャンネル情報の状態を取得
+        channels.jsonが更新されていなければキャッシュを返す
         """
-        if not os.path.exists(self.channels_file):
+        try:
+            stat = os.stat(self.channels_file)
+        except OSError:
             return None
         
+        if (
+            self._channels_info_cache is not None
+            and stat.st_mtime_ns == self._channels_info_mtime
+        ):
+            return self._channels_info_cache
+        
         try:
-            stat = os.stat(self.channels_file)
             last_modified = datetime.fromtimestamp(stat.st_mtime)
             
-            with open(self.channels_file, 'r', encoding='utf-8') as f:
-                channels_data = json.load(f)
+            channels_data = self.load_channels()
             
-            return {
+            self._channels_info_cache = {
                 "count": len(channels_data),
                 "last_modified": last_modified,
                 "data": channels_data
             }
+            self._channels_info_mtime = stat.st_mtime_ns
+            return self._channels_info_cache
         except Exception:
             return None
 
@@ -966,7 +1403,7 @@ class DiscordExporter:
         try:
             return curses.wrapper(self._main_menu_ui)
         except Exception as e:
-            console = Console()
+            console = CONSOLE
             console.print(f"[red]メニューUIエラー: {e}[/red]")
             return self._main_menu_cli()
 
@@ -985,71 +1422,106 @@ class DiscordExporter:
         curses.init_pair(4, curses.COLOR_RED, curses.COLOR_BLACK)    # 警告
         curses.init_pair(5, curses.COLOR_CYAN, curses.COLOR_BLACK)   # 情報
         
+        # 描画ループで使う属性値を一度だけ解決しておく
+        attr_selected = curses.color_pair(1) | curses.A_BOLD
+        attr_ok = curses.color_pair(2)
+        attr_title = curses.color_pair(3) | curses.A_BOLD
+        attr_warning = curses.color_pair(4)
+        attr_info = curses.color_pair(5)
+        
         current_pos = 0
         
+        # メニュー表示中に設定は変わらないため一度だけ読み込む
+        config = self.load_config()
+        
+        # メニュー表示中はチャンネル情報も変わらない
+        channels_info = self.get_channels_info()
+        
+        menu_items = [
+            ("1. チャンネル情報を更新", "update_channels"),
+            ("2. チャンネルを選択してエクスポート", "export_interactive"),
+            ("3. 設定を変更", "config"),
+            ("4. 終了", "exit")
+        ]
+        
+        title = "Discord Exporter メインメニュー"
+        help_text = "↑↓/jk: 移動 | ENTER/SPACE: 選択 | Q: 終了"
+        title_width = cell_len(title)
+        help_width = cell_len(help_text)
+        
+        # 中央寄せの位置と区切り線は端末幅が変わった時だけ計算し直す
+        layout_width = None
+        
+        # 状態が変わった時だけ描画する
+        needs_redraw = True
+        
         while True:
-            stdscr.clear()
-            height, width = stdscr.getmaxyx()
-            
-            # ヘッダー
-            title = "Discord Exporter メインメニュー"
-            stdscr.addstr(0, (width - len(title)) // 2, title, curses.color_pair(3) | curses.A_BOLD)
-            
-            help_text = "↑↓/jk: 移動 | ENTER/SPACE: 選択 | Q: 終了"
-            if len(help_text) < width:
-                stdscr.addstr(1, (width - len(help_text)) // 2, help_text, curses.color_pair(5))
-            
-            stdscr.addstr(2, 0, "="*min(width-1, 80))
-            
-            # チャンネル情報の状態を表示
-            y_offset = 4
-            channels_info = self.get_channels_info()
-            
-            if channels_info:
-                stdscr.addstr(y_offset, 2, f"📊 チャンネル情報: {channels_info['count']} チャンネル", curses.color_pair(2))
-                stdscr.addstr(y_offset + 1, 2, f"最終更新: {channels_info['last_modified'].strftime('%Y-%m-%d %H:%M:%S')}", curses.color_pair(5))
+            if needs_redraw:
+                # clear()は端末全体の再描画を強制するため、erase()で差分のみ出力させる
+                stdscr.erase()
+                height, width = stdscr.getmaxyx()
                 
-                # 更新が古い場合の警告
-                days_old = (datetime.now() - channels_info['last_modified']).days
-                if days_old > 7:
-                    stdscr.addstr(y_offset + 2, 2, f"⚠️  {days_old}日前の情報です（更新を推奨）", curses.color_pair(4))
-                    y_offset += 1
-            else:
-                stdscr.addstr(y_offset, 2, "❌ チャンネル情報がありません", curses.color_pair(4))
-                stdscr.addstr(y_offset + 1, 2, "最初にチャンネル情報を取得してください", curses.color_pair(5))
-            
-            y_offset += 4
-            
-            # メニュー項目
-            menu_items = [
-                ("1. チャンネル情報を更新", "update_channels"),
-                ("2. チャンネルを選択してエクスポート", "export_interactive"),
-                ("3. 設定を変更", "config"),
-                ("4. 終了", "exit")
-            ]
-            
-            for i, (label, action) in enumerate(menu_items):
-                if i == current_pos:
-                    stdscr.addstr(y_offset + i * 2, 4, f"→ {label}", curses.color_pair(1) | curses.A_BOLD)
+                if width != layout_width:
+                    layout_width = width
+                    title_x = max((width - title_width) // 2, 0)
+                    help_x = (width - help_width) // 2 if help_width < width else None
+                    separator = "=" * min(width - 1, 80)
+                
+                # ヘッダー
+                stdscr.addstr(0, title_x, title, attr_title)
+                
+                if help_x is not None:
+                    stdscr.addstr(1, help_x, help_text, attr_info)
+                
+                stdscr.addstr(2, 0, separator)
+                
+                # チャンネル情報の状態を表示
+                y_offset = 4
+                
+                if channels_info:
+                    stdscr.addstr(y_offset, 2, f"📊 チャンネル情報: {channels_info['count']} チャンネル", attr_ok)
+                    stdscr.addstr(y_offset + 1, 2, f"最終更新: {channels_info['last_modified'].strftime('%Y-%m-%d %H:%M:%S')}", attr_info)
+                
+                    # 更新が古い場合の警告
+                    days_old = (datetime.now() - channels_info['last_modified']).days
+                    if days_old > 7:
+                        stdscr.addstr(y_offset + 2, 2, f"⚠️  {days_old}日前の情報です（更新を推奨）", attr_warning)
+                        y_offset += 1
                 else:
-                    stdscr.addstr(y_offset + i * 2, 4, f"  {label}")
-            
-            # フッター情報
-            footer_y = height - 3
-            config = self.load_config()
-            if config.get("token"):
-                stdscr.addstr(footer_y, 2, f"Bot Token: 設定済み", curses.color_pair(2))
-            else:
-                stdscr.addstr(footer_y, 2, f"Bot Token: 未設定", curses.color_pair(4))
-            
-            stdscr.addstr(footer_y + 1, 2, f"出力ファイル: {config.get('output_file', '未設定')}", curses.color_pair(5))
-            
-            stdscr.refresh()
+                    stdscr.addstr(y_offset, 2, "❌ チャンネル情報がありません", attr_warning)
+                    stdscr.addstr(y_offset + 1, 2, "最初にチャンネル情報を取得してください", attr_info)
+                
+                y_offset += 4
+                
+                # メニュー項目
+                for i, (label, action) in enumerate(menu_items):
+                    if i == current_pos:
+                        stdscr.addstr(y_offset + i * 2, 4, f"→ {label}", attr_selected)
+                    else:
+                        stdscr.addstr(y_offset + i * 2, 4, f"  {label}")
+                
+                # フッター情報
+                footer_y = height - 3
+                if config.get("token"):
+                    stdscr.addstr(footer_y, 2, f"Bot Token: 設定済み", attr_ok)
+                else:
+                    stdscr.addstr(footer_y, 2, f"Bot Token: 未設定", attr_warning)
+                
+                stdscr.addstr(footer_y + 1, 2, f"出力ファイル: {config.get('output_file', '未設定')}", attr_info)
+                
+                stdscr.noutrefresh()
+                curses.doupdate()
+                needs_redraw = False
             
             # キー入力処理
             key = stdscr.getch()
             
-            if key == ord('q') or key == ord('Q'):
+            if key == curses.KEY_RESIZE:
+                # 端末サイズ変更時のみ画面全体を再描画
+                stdscr.clear()
+                needs_redraw = True
+            
+            elif key == ord('q') or key == ord('Q'):
                 return "exit"
             
             elif key == ord('\n') or key == 10 or key == ord(' '):  # Enter or Space
@@ -1057,9 +1529,11 @@ class DiscordExporter:
             
             elif key == curses.KEY_UP or key == ord('k') or key == ord('K'):
                 current_pos = (current_pos - 1) % len(menu_items)
+                needs_redraw = True
             
             elif key == curses.KEY_DOWN or key == ord('j') or key == ord('J'):
                 current_pos = (current_pos + 1) % len(menu_items)
+                needs_redraw = True
             
             elif key in [ord('1'), ord('2'), ord('3'), ord('4')]:
                 # 数字キーで直接選択
@@ -1071,7 +1545,7 @@ class DiscordExporter:
         """
         CLIでのメインメニュー
         """
-        console = Console()
+        console = CONSOLE
         
         while True:
             console.print("\n" + "="*60)
@@ -1118,25 +1592,26 @@ class DiscordExporter:
         """
         メインメニューに戻るかどうかを確認
         """
-        console = Console()
+        console = CONSOLE
         console.print("\n" + "="*50)
         console.print("🎯 [bold]操作完了[/bold]")
         console.print("="*50)
         
-        while True:
-            try:
-                response = get_single_key_input("メインメニューに戻りますか？ (y/N): ")
-                if response in ['y']:
-                    print("y")
-                    return True
-                elif response in ['n', '\n', '\r', '\x1b']:  # n, Enter, ESC
-                    print("n" if response == 'n' else "")
+        with raw_tty():
+            while True:
+                try:
+                    response = get_single_key_input("メインメニューに戻りますか？ (y/N): ")
+                    if response in ['y']:
+                        print("y")
+                        return True
+                    elif response in ['n', '\n', '\r', '\x1b']:  # n, Enter, ESC
+                        print("n" if response == 'n' else "")
+                        return False
+                    # その他のキーは無視して再入力待ち
+                    print(f"\r続行しますか？ (y/N): ", end="", flush=True)
+                except (KeyboardInterrupt, EOFError):
+                    print("\n")
                     return False
-                # その他のキーは無視して再入力待ち
-                print(f"\r続行しますか？ (y/N): ", end="", flush=True)
-            except (KeyboardInterrupt, EOFError):
-                print("\n")
-                return False
 
     async def cleanup_client(self):
         """
@@ -1163,6 +1638,13 @@ class DiscordExporter:
                 
             # コネクターのクリーンアップを待つ
             await asyncio.sleep(0.1)
+
+            # login() で開始した接続タスクの終了を待つ
+            self._logged_in = False
+            if self._client_task is not None:
+                client_task = self._client_task
+                self._client_task = None
+                await asyncio.gather(client_task, return_exceptions=True)
                 
         except Exception as close_error:
             # クリーンアップエラーは静かに無視
@@ -1183,7 +1665,7 @@ class DiscordExporter:
             return config
             
         except Exception as e:
-            console = Console()
+            console = CONSOLE
             console.print(f"[red]設定UIエラー: {e}[/red]")
             console.print("[yellow]CLIモードで設定を入力してください...[/yellow]")
             return self._config_cli()
@@ -1203,6 +1685,13 @@ class DiscordExporter:
         curses.init_pair(4, curses.COLOR_RED, curses.COLOR_BLACK)    # エラー
         curses.init_pair(5, curses.COLOR_CYAN, curses.COLOR_BLACK)   # 説明
         
+        # 描画ループで使う属性値を一度だけ解決しておく
+        attr_selected = curses.color_pair(1)
+        attr_selected_bold = attr_selected | curses.A_BOLD
+        attr_header = curses.color_pair(3)
+        attr_title = attr_header | curses.A_BOLD
+        attr_info = curses.color_pair(5)
+        
         # 既存の設定を読み込み
         config = self.load_config()
         
@@ -1218,33 +1707,56 @@ class DiscordExporter:
         
         current_field = 0
         editing = False
-        edit_text = ""
+        # 編集中の文字列は一文字ずつリストに積み、確定・描画時に連結する
+        edit_buf = []
+        
+        title = "Discord Exporter 設定"
+        help_text = "↑↓/jk: 移動 | ENTER: 編集/選択 | TAB: 次へ | F10: 保存してメニューに戻る | ESC: キャンセル"
+        title_width = cell_len(title)
+        help_width = cell_len(help_text)
+        
+        # 中央寄せの位置と区切り線は端末幅が変わった時だけ計算し直す
+        layout_width = None
+        
+        # フィールドの説明
+        descriptions = {
+            "token": "Discord Developer PortalでBotを作成してTokenを取得",
+            "output_file": "出力ファイル名 (.xlsx / .parquet / .feather / .csv)",
+            "after_date": "この日付以降のメッセージのみ (例: 2024-01-01)",
+            "before_date": "この日付以前のメッセージのみ (例: 2024-12-31)",
+            "limit": "チャンネル毎の最大メッセージ数 (空白=制限なし)",
+            "mode": "fetch-channels: チャンネル情報取得, interactive: TUI選択, cli: CLI選択"
+        }
         
         while True:
-            stdscr.clear()
+            # clear()は端末全体の再描画を強制するため、erase()で差分のみ出力させる
+            stdscr.erase()
             height, width = stdscr.getmaxyx()
             
-            # ヘッダー
-            title = "Discord Exporter 設定"
-            stdscr.addstr(0, (width - len(title)) // 2, title, curses.color_pair(3) | curses.A_BOLD)
-            
-            help_text = "↑↓/jk: 移動 | ENTER: 編集/選択 | TAB: 次へ | F10: 保存してメニューに戻る | ESC: キャンセル"
-            if len(help_text) < width:
-                stdscr.addstr(1, (width - len(help_text)) // 2, help_text, curses.color_pair(5))
+            if width != layout_width:
+                layout_width = width
+                title_x = max((width - title_width) // 2, 0)
+                help_x = (width - help_width) // 2 if help_width < width else None
+                separator = "=" * min(width - 1, 80)
+                
+                # ヘッダーの描画内容は幅が変わらない限り同じ
+                header_ops = [(0, title_x, title, attr_title)]
+                if help_x is not None:
+                    header_ops.append((1, help_x, help_text, attr_info))
+                header_ops.append((2, 0, separator, 0))
             
-            stdscr.addstr(2, 0, "="*min(width-1, 80))
+            # 1フレーム分の描画内容を (y, x, 文字列, 属性) として集め、最後にまとめて出力する
+            draw_ops = list(header_ops)
             
             # フォームフィールドを表示
             y_offset = 4
             for i, field in enumerate(fields):
+                is_current = i == current_field
                 label = field["label"] + ":"
                 value = field["value"]
                 
                 # ラベル表示
-                if i == current_field:
-                    stdscr.addstr(y_offset, 2, label, curses.color_pair(1) | curses.A_BOLD)
-                else:
-                    stdscr.addstr(y_offset, 2, label)
+                draw_ops.append((y_offset, 2, label, attr_selected_bold if is_current else 0))
                 
                 # 値の表示
                 display_value = value
@@ -1253,37 +1765,30 @@ class DiscordExporter:
                 elif field["type"] == "select":
                     display_value = f"[{value}]"
                 
-                if editing and i == current_field:
+                options_height = 0
+                if editing and is_current:
                     # 編集中
                     if field["type"] == "select":
                         # セレクトボックスの選択肢を表示
-                        stdscr.addstr(y_offset + 1, 4, "選択肢:", curses.color_pair(5))
+                        draw_ops.append((y_offset + 1, 4, "選択肢:", attr_info))
                         for j, option in enumerate(field["options"]):
                             marker = ">" if option == value else " "
-                            color = curses.color_pair(1) if option == value else 0
-                            stdscr.addstr(y_offset + 2 + j, 6, f"{marker} {option}", color)
+                            color = attr_selected if option == value else 0
+                            draw_ops.append((y_offset + 2 + j, 6, f"{marker} {option}", color))
+                        options_height = len(field["options"])
                     else:
-                        display_value = edit_text + "_"
-                        stdscr.addstr(y_offset + 1, 4, display_value, curses.color_pair(1))
+                        display_value = "".join(edit_buf) + "_"
+                        draw_ops.append((y_offset + 1, 4, display_value, attr_selected))
                 else:
-                    stdscr.addstr(y_offset + 1, 4, display_value)
+                    draw_ops.append((y_offset + 1, 4, display_value, 0))
                 
                 # フィールドの説明
-                if i == current_field:
-                    descriptions = {
-                        "token": "Discord Developer PortalでBotを作成してTokenを取得",
-                        "output_file": "エクスポートするExcelファイル名 (.xlsx)",
-                        "after_date": "この日付以降のメッセージのみ (例: 2024-01-01)",
-                        "before_date": "この日付以前のメッセージのみ (例: 2024-12-31)",
-                        "limit": "チャンネル毎の最大メッセージ数 (空白=制限なし)",
-                        "mode": "fetch-channels: チャンネル情報取得, interactive: TUI選択, cli: CLI選択"
-                    }
+                if is_current:
                     desc = descriptions.get(field["name"], "")
                     if desc and len(desc) < width - 6:
-                        stdscr.addstr(y_offset + 2 + (len(field.get("options", [])) if editing and field["type"] == "select" else 0), 
-                                    4, desc, curses.color_pair(5))
+                        draw_ops.append((y_offset + 2 + options_height, 4, desc, attr_info))
                 
-                y_offset += 4 + (len(field.get("options", [])) if editing and field["type"] == "select" and i == current_field else 0)
+                y_offset += 4 + options_height
                 
                 if y_offset >= height - 5:
                     break
@@ -1293,13 +1798,22 @@ class DiscordExporter:
             if any(not field["value"] for field in fields[:2]):  # tokenとoutput_fileは必須
                 footer = "必須項目を入力してください"
             
-            stdscr.addstr(height-1, 0, footer[:width-1], curses.color_pair(3))
-            stdscr.refresh()
+            draw_ops.append((height - 1, 0, footer[:width-1], attr_header))
+            
+            addstr = stdscr.addstr
+            for y, x, text, attr in draw_ops:
+                addstr(y, x, text, attr)
+            stdscr.noutrefresh()
+            curses.doupdate()
             
             # キー入力処理
             key = stdscr.getch()
             
-            if key == 27:  # ESC
+            if key == curses.KEY_RESIZE:
+                # サイズ変更時は画面全体を描き直す
+                stdscr.clear()
+            
+            elif key == 27:  # ESC
                 return None
             
             elif key == curses.KEY_F10:  # F10で実行
@@ -1348,20 +1862,21 @@ class DiscordExporter:
             elif key == ord('\n') or key == 10:  # Enter
                 if editing:
                     if fields[current_field]["type"] != "select":
-                        fields[current_field]["value"] = edit_text
+                        fields[current_field]["value"] = "".join(edit_buf)
                     editing = False
                 else:
                     if fields[current_field]["type"] == "select":
                         editing = True
                     else:
                         editing = True
-                        edit_text = fields[current_field]["value"]
+                        edit_buf = list(fields[current_field]["value"])
             
             elif editing and fields[current_field]["type"] != "select":
                 if key == curses.KEY_BACKSPACE or key == 127:
-                    edit_text = edit_text[:-1]
+                    if edit_buf:
+                        edit_buf.pop()
                 elif 32 <= key <= 126:  # 印刷可能文字
-                    edit_text += chr(key)
+                    edit_buf.append(chr(key))
 
     def _config_cli(self):
         """
@@ -1371,30 +1886,19 @@ class DiscordExporter:
         
         print("\n=== Discord Exporter 設定 ===")
         
-        # Discord Bot Token
-        token = input(f"Discord Bot Token [{config.get('token', '')}]: ").strip()
-        if not token:
-            token = config.get('token', '')
-        
-        # 出力ファイル名
-        output_file = input(f"出力ファイル名 [{config.get('output_file', 'discord_export.xlsx')}]: ").strip()
-        if not output_file:
-            output_file = config.get('output_file', 'discord_export.xlsx')
-        
-        # 開始日
-        after_date = input(f"開始日 (YYYY-MM-DD) [{config.get('after_date', '')}]: ").strip()
-        if not after_date:
-            after_date = config.get('after_date', '')
-        
-        # 終了日
-        before_date = input(f"終了日 (YYYY-MM-DD) [{config.get('before_date', '')}]: ").strip()
-        if not before_date:
-            before_date = config.get('before_date', '')
-        
-        # メッセージ数制限
-        limit = input(f"メッセージ数制限 [{config.get('limit', '')}]: ").strip()
-        if not limit:
-            limit = config.get('limit', '')
+        # 現在値は一度だけ取り出し、プロンプトと未入力時の既定値に使う
+        fields = (
+            ("token", "Discord Bot Token", ""),
+            ("output_file", "出力ファイル名", "discord_export.xlsx"),
+            ("after_date", "開始日 (YYYY-MM-DD)", ""),
+            ("before_date", "終了日 (YYYY-MM-DD)", ""),
+            ("limit", "メッセージ数制限", ""),
+        )
+        values = {}
+        for key, label, default in fields:
+            current = config.get(key, default)
+            values[key] = input(f"{label} [{current}]: ").strip() or current
+        limit = str(values["limit"])
         
         # 実行モード
         print("実行モード:")
@@ -1403,20 +1907,58 @@ class DiscordExporter:
         print("  3. cli (CLI選択)")
         
         mode_map = {"1": "fetch-channels", "2": "interactive", "3": "cli"}
-        mode_choice = input(f"選択 [2]: ").strip()
+        mode_choice = input("選択 [2]: ").strip()
         mode = mode_map.get(mode_choice, "interactive")
         
         return {
-            "token": token,
-            "output_file": output_file,
-            "after_date": after_date,
-            "before_date": before_date,
+            "token": values["token"],
+            "output_file": values["output_file"],
+            "after_date": values["after_date"],
+            "before_date": values["before_date"],
             "limit": int(limit) if limit.isdigit() else "",
             "mode": mode
         }
 
+    def _load_export_checkpoint(self, checkpoint_file, header):
+        """
+        エクスポート条件（ヘッダー）が一致するチェックポイントから取得済みの行を読み込む
+        """
+        try:
+            with open(checkpoint_file, "rb") as f:
+                lines = f.read().splitlines()
+            if not lines or json_loads(lines[0]) != header:
+                return []
+        except (OSError, ValueError):
+            return []
+
+        rows = []
+        for line in lines[1:]:
+            try:
+                rows.append(ChannelMessageRow._make(json_loads(line)))
+            except (ValueError, TypeError):
+                # 書き込み途中で中断された末尾の行は捨てる
+                break
+        return rows
+
+    def _append_export_checkpoint(self, checkpoint_file, rows, saved_count):
+        """
+        チェックポイントに未保存の行を追記し、保存済みの行数を返す
+        """
+        if saved_count < len(rows):
+            with open(checkpoint_file, "ab") as f:
+                f.write(
+                    b"".join(json_dumps(tuple(row)) + b"\n" for row in rows[saved_count:])
+                )
+        return len(rows)
+
     async def export_channel_to_xlsx(
-        self, channel_id, output_file, after_date=None, before_date=None, limit=None
+        self,
+        channel_id,
+        output_file,
+        after_date=None,
+        before_date=None,
+        limit=None,
+        output_format=None,
     ):
         """
         DiscordチャンネルをXLSXファイルにエクスポート
@@ -1427,7 +1969,9 @@ class DiscordExporter:
             after_date (datetime): この日付以降のメッセージ
             before_date (datetime): この日付以前のメッセージ
             limit (int): メッセージ数の上限
+            output_format (str): 出力形式（未指定の場合は拡張子から判定）
         """
+        import pandas as pd
 
         await self.client.wait_until_ready()
 
@@ -1440,9 +1984,6 @@ class DiscordExporter:
             channel_name = getattr(channel, "name", f"Channel {channel.id}")
             print(f"チャンネル '{channel_name}' からメッセージを取得中...")
 
-            messages_data = []
-            message_count = 0
-
             # メッセージ履歴を取得
             if not hasattr(channel, "history"):
                 print(f"チャンネル '{channel_name}' はメッセージ履歴を持っていません")
@@ -1456,124 +1997,178 @@ class DiscordExporter:
             # メッセージ履歴を持つチャンネルの型を定義
             messageable_channel = cast(discord.abc.Messageable, channel)
 
-            async for message in messageable_channel.history(
-                limit=limit, after=after_date, before=before_date, oldest_first=False
-            ):
-                # 添付ファイルのURL取得
-                attachments = []
-                for attachment in message.attachments:
-                    attachments.append(
-                        {
-                            "filename": attachment.filename,
-                            "url": attachment.url,
-                            "size": attachment.size,
-                        }
-                    )
-
-                # リアクション情報
-                reactions = []
-                for reaction in message.reactions:
-                    reactions.append(
-                        {"emoji": str(reaction.emoji), "count": reaction.count}
-                    )
+            # 中断時も取得済みの行を残し、次回は最古の取得済みメッセージの続きから取得する
+            # （終了日時の指定がなければ、前回の実行後に投稿されたメッセージも取得する）
+            checkpoint_file = output_file + ".partial"
+            checkpoint_header = {
+                "channel_id": channel_id,
+                "after": after_date.isoformat() if after_date else None,
+                "before": before_date.isoformat() if before_date else None,
+                "limit": limit,
+            }
 
-                # メンション情報
-                mentions = [user.display_name for user in message.mentions]
-
-                # メッセージデータを構築
-                message_data = {
-                    "timestamp": message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    "author_name": message.author.display_name,
-                    "author_id": str(message.author.id),
-                    "content": message.content,
-                    "message_id": str(message.id),
-                    "channel_name": channel_name,
-                    "edited_at": message.edited_at.strftime("%Y-%m-%d %H:%M:%S")
-                    if message.edited_at
-                    else "",
-                    "reply_to": str(message.reference.message_id)
-                    if message.reference
-                    else "",
-                    "attachments_count": len(attachments),
-                    "attachments_urls": "; ".join([att["url"] for att in attachments]),
-                    "reactions_count": len(reactions),
-                    "reactions": "; ".join(
-                        [f"{r['emoji']}({r['count']})" for r in reactions]
-                    ),
-                    "mentions": "; ".join(mentions),
-                    "is_bot": message.author.bot,
-                    "message_type": str(message.type),
-                }
+            # 1メッセージ1行（ChannelMessageRow）で保持する
+            message_rows = self._load_export_checkpoint(
+                checkpoint_file, checkpoint_header
+            )
+            history_before = before_date
+            history_limit = limit
+            history_newest = None
+            newer_limit = None
+            if message_rows:
+                print(f"前回の中断位置から再開します（取得済み: {len(message_rows)} メッセージ）")
+                # 新しいメッセージを追加取得した後に中断された場合、行は新しい順に並んでいない
+                message_ids = [int(row.message_id) for row in message_rows]
+                history_before = discord.Object(id=min(message_ids))
+                if limit is not None:
+                    history_limit = max(limit - len(message_rows), 0)
+                if before_date is None:
+                    history_newest = discord.Object(id=max(message_ids))
+                    if limit is not None:
+                        # 前回の実行後に投稿された分の取得も limit 件で打ち切る
+                        # （先頭の行は初回実行で最初に取得した最新メッセージなので、それより新しい行が追加取得分。
+                        # 古い順に取得するため、途中で中断されても最大IDから続ければ隙間はできない）
+                        first_newest_id = message_ids[0]
+                        newer_limit = limit - sum(
+                            1 for message_id in message_ids if message_id > first_newest_id
+                        )
+                del message_ids
+            else:
+                with open(checkpoint_file, "wb") as f:
+                    f.write(json_dumps(checkpoint_header) + b"\n")
+            message_count = len(message_rows)
+            saved_count = message_count
+            next_report = next_progress_report(message_count)
+
+            # 取得範囲（再開時は前回の最新メッセージより後に投稿された分を古い順に追加取得する）
+            # （追加取得分だけで limit 件に達している場合、古い側の続きは取得しない）
+            history_ranges = []
+            if history_limit != 0:
+                history_ranges.append(
+                    {
+                        "limit": history_limit,
+                        "after": after_date,
+                        "before": history_before,
+                        "oldest_first": False,
+                    }
+                )
+            if history_newest is not None and (newer_limit is None or newer_limit > 0):
+                history_ranges.append(
+                    {"limit": newer_limit, "after": history_newest, "oldest_first": True}
+                )
 
-                messages_data.append(message_data)
-                message_count += 1
+            try:
+                for history_kwargs in history_ranges:
+                    async for message in messageable_channel.history(**history_kwargs):
+                        # 添付ファイル・リアクション・メンションは必要な文字列だけを一度で組み立てる（空なら結合しない）
+                        attachments = message.attachments
+                        reactions = message.reactions
+                        mentions = message.mentions
+
+                        # メッセージデータを構築
+                        message_rows.append(
+                            ChannelMessageRow(
+                                message.created_at.replace(tzinfo=None),
+                                message.author.display_name,
+                                str(message.author.id),
+                                message.content,
+                                str(message.id),
+                                channel_name,
+                                message.edited_at.replace(tzinfo=None)
+                                if message.edited_at
+                                else None,
+                                str(message.reference.message_id)
+                                if message.reference
+                                else "",
+                                len(attachments),
+                                "; ".join([att.url for att in attachments]) if attachments else "",
+                                len(reactions),
+                                "; ".join([f"{r.emoji}({r.count})" for r in reactions]) if reactions else "",
+                                "; ".join([user.display_name for user in mentions]) if mentions else "",
+                                message.author.bot,
+                                str(message.type),
+                            )
+                        )
+                        message_count += 1
+
+                        if message_count >= next_report:
+                            print(f"取得済み: {message_count} メッセージ")
+                            next_report = next_progress_report(message_count)
+                        if message_count - saved_count >= CHECKPOINT_INTERVAL:
+                            saved_count = self._append_export_checkpoint(
+                                checkpoint_file, message_rows, saved_count
+                            )
+            finally:
+                # エラーや中断で抜けた場合も未保存の行をチェックポイントに追記する
+                self._append_export_checkpoint(
+                    checkpoint_file, message_rows, saved_count
+                )
 
-                if message_count % 100 == 0:
-                    print(f"取得済み: {message_count} メッセージ")
+            # 新しいメッセージを追加取得した場合も、上限は最新の limit 件とする
+            if limit is not None and len(message_rows) > limit:
+                message_rows.sort(key=lambda row: int(row.message_id), reverse=True)
+                del message_rows[limit:]
 
             # DataFrameに変換
-            df = pd.DataFrame(messages_data)
+            df = pd.DataFrame.from_records(
+                message_rows, columns=CHANNEL_MESSAGE_COLUMNS
+            )
+            del message_rows
+
+            # 日時はdatetime64のまま保持し、書式は出力側に任せる
+            # （チェックポイントから再開した行はISO 8601文字列で読み込まれる）
+            for column in ("timestamp", "edited_at"):
+                df[column] = pd.to_datetime(df[column], format="ISO8601")
 
             # 時系列順にソート（古い順）
             df = df.sort_values("timestamp")
 
-            # XLSXファイルに保存
-            with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-                # メインシート
-                df.to_excel(writer, sheet_name="Messages", index=False)
-
-                # 統計シート
-                stats_data = {
-                    "メトリック": [
-                        "総メッセージ数",
-                        "ユニークユーザー数",
-                        "ボットメッセージ数",
-                        "添付ファイル数",
-                        "リアクション付きメッセージ数",
-                        "エクスポート日時",
-                        "チャンネル名",
-                    ],
-                    "値": [
-                        len(df),
-                        df["author_name"].nunique(),
-                        len(df[df["is_bot"] == True]),
-                        df["attachments_count"].sum(),
-                        len(df[df["reactions_count"] > 0]),
-                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        channel_name,
-                    ],
-                }
+            # ユーザー数は統計シートと完了メッセージで使うので一度だけ数える
+            user_count = df["author_name"].nunique()
+
+            # 統計シート（数行だけなのでDataFrameにせず見出し行から始まる行のリストで渡す）
+            stats_rows = [
+                ("メトリック", "値"),
+                ("総メッセージ数", len(df)),
+                ("ユニークユーザー数", user_count),
+                ("ボットメッセージ数", int(df["is_bot"].sum())),
+                ("添付ファイル数", int(df["attachments_count"].sum())),
+                ("リアクション付きメッセージ数", int((df["reactions_count"] > 0).sum())),
+                ("エクスポート日時", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                ("チャンネル名", channel_name),
+            ]
 
-                stats_df = pd.DataFrame(stats_data)
-                stats_df.to_excel(writer, sheet_name="Statistics", index=False)
-
-                # ユーザー別統計
-                user_stats = (
-                    df.groupby("author_name")
-                    .agg(
-                        {
-                            "message_id": "count",
-                            "attachments_count": "sum",
-                            "reactions_count": "sum",
-                        }
-                    )
-                    .rename(
-                        {
-                            "message_id": "メッセージ数",
-                            "attachments_count": "添付ファイル数",
-                            "reactions_count": "リアクション数",
-                        },
-                        axis=1,
-                    )
-                    .reset_index()
+            # ユーザー別統計
+            user_stats = (
+                df.groupby("author_name", observed=True)
+                .agg(
+                    メッセージ数=("message_id", "size"),
+                    添付ファイル数=("attachments_count", "sum"),
+                    リアクション数=("reactions_count", "sum"),
                 )
+                .reset_index()
+            )
+
+            # XLSXファイルに保存（イベントループを塞がないようワーカースレッドで実行）
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                write_export,
+                output_file,
+                [
+                    ("Messages", df),
+                    ("Statistics", stats_rows),
+                    ("User_Statistics", user_stats),
+                ],
+                detect_export_format(output_file, output_format),
+            )
 
-                user_stats.to_excel(writer, sheet_name="User_Statistics", index=False)
+            # 書き出しが完了したのでチェックポイントは不要
+            os.remove(checkpoint_file)
 
             print("✅ エクスポート完了!")
             print(f"   ファイル: {output_file}")
             print(f"   メッセージ数: {len(df)}")
-            print(f"   ユーザー数: {df['author_name'].nunique()}")
+            print(f"   ユーザー数: {user_count}")
             
             # エクスポート完了後の継続確認
             return True
@@ -1583,7 +2178,8 @@ class DiscordExporter:
             return False
 
         finally:
-            await self.client.close()
+            if not self._logged_in:
+                await self.client.close()
 
     async def export_multiple_channels(
         self,
@@ -1592,195 +2188,274 @@ class DiscordExporter:
         after_date=None,
         before_date=None,
         limit=None,
+        output_format=None,
     ):
         """
         複数チャンネルを一つのExcelファイルにエクスポート
         """
-        await self.client.wait_until_ready()
+        import pandas as pd
 
-        all_messages_data = []
+        await self.client.wait_until_ready()
 
+        def columns_to_frame(message_columns):
+            """
+            列毎のリストを日時列をdatetime64にしたDataFrameにする
+            """
+            frame = pd.DataFrame(message_columns, columns=MULTI_MESSAGE_COLUMNS)
+            # 日時はdatetime64のまま保持し、書式は出力側に任せる
+            for column in ("timestamp", "edited_at"):
+                frame[column] = pd.to_datetime(frame[column])
+            return frame
+
+        # pyarrowがあればバッチ毎にParquetの一時ファイルへ書き出し、取得中にメモリ上へ溜める行を抑える
         try:
-            for channel_info in selected_channels:
-                channel_id = channel_info["channel_id"]
-                channel_name = channel_info["channel_name"]
-                guild_name = channel_info["guild_name"]
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            pa = pq = None
+        spool_file = None
+        spool_writer = None
+        # pyarrowがない場合のバッチ毎のDataFrame（最後にまとめて連結する）
+        message_frames = []
+        total_messages = 0
+
+        def store_batch(channel_index, frame):
+            """
+            1バッチ分のDataFrameを一時ファイルへ書き出す（pyarrowがなければメモリ上に保持）
+            チャンネルは並行して取得するため、最後に選択順へ並べ直せるよう channel_index 列を付ける
+            """
+            nonlocal spool_file, spool_writer, total_messages
+            total_messages += len(frame)
+            frame["channel_index"] = channel_index
+            if pq is None:
+                message_frames.append(frame)
+                return
+            if spool_writer is None:
+                # 編集日時が全て空のバッチでも型が揃うよう日時列の型は固定する
+                schema = pa.Schema.from_pandas(frame, preserve_index=False)
+                for column in ("timestamp", "edited_at"):
+                    schema = schema.set(
+                        schema.get_field_index(column),
+                        pa.field(column, pa.timestamp("us")),
+                    )
+                fd, spool_file = tempfile.mkstemp(suffix=".parquet")
+                os.close(fd)
+                spool_writer = pq.ParquetWriter(spool_file, schema)
+            spool_writer.write_table(
+                pa.Table.from_pandas(frame, schema=spool_writer.schema, preserve_index=False)
+            )
 
-                print(f"\n🔄 [{guild_name}] #{channel_name} を処理中...")
+        # 同時にメッセージ履歴を取得するチャンネル数の上限（Discordのレート制限を考慮）
+        EXPORT_CONCURRENCY = 4
 
-                channel = self.client.get_channel(channel_id)
-                if not channel:
-                    print(f"❌ チャンネルID {channel_id} が見つかりません")
-                    continue
+        async def fetch_channel(channel_index, channel_info):
+            """
+            1チャンネル分のメッセージを取得し、FRAME_BATCH_SIZE 行毎に store_batch() へ渡す
+            """
+            # メッセージは行毎ではなく列毎のリストに溜める（列順は MULTI_MESSAGE_COLUMNS）
+            message_columns = {column: [] for column in MULTI_MESSAGE_COLUMNS}
+            column_appends = [message_columns[column].append for column in MULTI_MESSAGE_COLUMNS]
+            message_ids = message_columns["message_id"]
 
-                if not hasattr(channel, "history"):
-                    print(
-                        f"❌ チャンネル '{channel_name}' はメッセージ履歴を持っていません"
-                    )
-                    continue
+            def add_row(row):
+                for append, value in zip(column_appends, row):
+                    append(value)
 
-                # 型チェック対応
-                from typing import cast
+            def flush_rows():
+                # 溜まった列毎のリストをDataFrameにまとめて解放する
+                if message_ids:
+                    store_batch(channel_index, columns_to_frame(message_columns))
+                    for values in message_columns.values():
+                        values.clear()
 
-                import discord
+            channel_id = channel_info["channel_id"]
+            channel_name = channel_info["channel_name"]
+            guild_name = channel_info["guild_name"]
 
-                messageable_channel = cast(discord.abc.Messageable, channel)
+            print(f"\n🔄 [{guild_name}] #{channel_name} を処理中...")
 
-                message_count = 0
+            channel = self.client.get_channel(channel_id)
+            if not channel:
+                print(f"❌ チャンネルID {channel_id} が見つかりません")
+                return
+
+            if not hasattr(channel, "history"):
+                print(
+                    f"❌ チャンネル '{channel_name}' はメッセージ履歴を持っていません"
+                )
+                return
+
+            # 型チェック対応
+            from typing import cast
+
+            import discord
+
+            messageable_channel = cast(discord.abc.Messageable, channel)
+
+            message_count = 0
+            next_report = next_progress_report(message_count)
+            
+            # パラメータの型安全性を確保
+            safe_limit = None if limit is None or limit == "" else int(limit) if str(limit).isdigit() else None
+            safe_after = after_date if after_date is not None else None
+            safe_before = before_date if before_date is not None else None
+            
+            # print(f"  メッセージ取得を開始...")
+            # print(f"    limit: {safe_limit} (type: {type(safe_limit)})")
+            # print(f"    after: {safe_after} (type: {type(safe_after)})")
+            # print(f"    before: {safe_before} (type: {type(safe_before)})")
+            
+            try:
+                # 段階的にパラメータを追加してエラーを特定
+                # print("    基本的なhistory()を試行...")
                 
-                # パラメータの型安全性を確保
-                safe_limit = None if limit is None or limit == "" else int(limit) if str(limit).isdigit() else None
-                safe_after = after_date if after_date is not None else None
-                safe_before = before_date if before_date is not None else None
+                # 最もシンプルな形から開始
+                if safe_limit is None and safe_after is None and safe_before is None:
+                    # print("    パラメータなしで実行")
+                    message_iter = messageable_channel.history()
+                elif safe_after is None and safe_before is None:
+                    # print(f"    limit={safe_limit}のみで実行")
+                    message_iter = messageable_channel.history(limit=safe_limit)
+                else:
+                    # print(f"    全パラメータで実行")
+                    message_iter = messageable_channel.history(
+                        limit=safe_limit,
+                        after=safe_after,
+                        before=safe_before
+                    )
                 
-                # print(f"  メッセージ取得を開始...")
-                # print(f"    limit: {safe_limit} (type: {type(safe_limit)})")
-                # print(f"    after: {safe_after} (type: {type(safe_after)})")
-                # print(f"    before: {safe_before} (type: {type(safe_before)})")
+                async for message in message_iter:
+                    try:
+                        # 添付ファイル・リアクション・メンションは必要な文字列だけを一度で組み立てる（空なら結合しない）
+                        attachments = message.attachments
+                        reactions = message.reactions
+                        mentions = message.mentions
+
+                        # メッセージデータ
+                        add_row(
+                            (
+                                message.created_at.replace(tzinfo=None),
+                                message.author.display_name,
+                                str(message.author.id),
+                                message.content,
+                                str(message.id),
+                                guild_name,
+                                channel_name,
+                                message.edited_at.replace(tzinfo=None)
+                                if message.edited_at
+                                else None,
+                                str(message.reference.message_id)
+                                if message.reference
+                                else "",
+                                len(attachments),
+                                "; ".join([att.url for att in attachments]) if attachments else "",
+                                len(reactions),
+                                "; ".join([f"{r.emoji}({r.count})" for r in reactions]) if reactions else "",
+                                "; ".join([user.display_name for user in mentions]) if mentions else "",
+                                message.author.bot,
+                                str(message.type),
+                            )
+                        )
+                        message_count += 1
+                        if len(message_ids) >= FRAME_BATCH_SIZE:
+                            flush_rows()
+
+                        if message_count >= next_report:
+                            print(f"  #{channel_name} 取得済み: {message_count} メッセージ")
+                            next_report = next_progress_report(message_count)
+                            
+                    except Exception as msg_error:
+                        # print(f"  メッセージ処理エラー (message_count={message_count}): {msg_error}")
+                        # print(f"    問題のメッセージID: {getattr(message, 'id', 'Unknown')}")
+                        # print(f"    created_at: {getattr(message, 'created_at', 'Unknown')} (type: {type(getattr(message, 'created_at', None))})")
+                        continue
+                        
+            except Exception as history_error:
+                # print(f"  メッセージ履歴取得エラー: {history_error}")
+                # print(f"  エラーの種類: {type(history_error).__name__}")
                 
+                # 代替手法を試行
+                # print("  代替手法で再試行...")
                 try:
-                    # 段階的にパラメータを追加してエラーを特定
-                    # print("    基本的なhistory()を試行...")
-                    
-                    # 最もシンプルな形から開始
-                    if safe_limit is None and safe_after is None and safe_before is None:
-                        # print("    パラメータなしで実行")
-                        message_iter = messageable_channel.history()
-                    elif safe_after is None and safe_before is None:
-                        # print(f"    limit={safe_limit}のみで実行")
-                        message_iter = messageable_channel.history(limit=safe_limit)
-                    else:
-                        # print(f"    全パラメータで実行")
-                        message_iter = messageable_channel.history(
-                            limit=safe_limit,
-                            after=safe_after,
-                            before=safe_before
-                        )
-                    
-                    async for message in message_iter:
+                    # 最もシンプルなメッセージ取得
+                    # print("    シンプルなhistory(limit=10)で再試行")
+                    simple_count = 0
+                    async for simple_message in messageable_channel.history(limit=10):
                         try:
-                            # メッセージの基本情報をデバッグ出力
-                            # if message_count < 5:  # 最初の5件だけ詳細出力
-                            #     print(f"    メッセージ{message_count}: ID={message.id} (type: {type(message.id)})")
-                            #     print(f"      created_at: {message.created_at} (type: {type(message.created_at)})")
-                            #     print(f"      author: {message.author.display_name} (id: {message.author.id}, type: {type(message.author.id)})")
-                            
-                            # 添付ファイル情報
-                            attachments = []
-                            for attachment in message.attachments:
-                                attachments.append(
-                                    {
-                                        "filename": attachment.filename,
-                                        "url": attachment.url,
-                                        "size": attachment.size,
-                                    }
+                            add_row(
+                                (
+                                    simple_message.created_at.replace(tzinfo=None),
+                                    simple_message.author.display_name,
+                                    str(simple_message.author.id),
+                                    simple_message.content,
+                                    str(simple_message.id),
+                                    guild_name,
+                                    channel_name,
+                                    None,
+                                    "",
+                                    0,
+                                    "",
+                                    0,
+                                    "",
+                                    "",
+                                    simple_message.author.bot,
+                                    str(simple_message.type),
                                 )
-    
-                            # リアクション情報
-                            reactions = []
-                            for reaction in message.reactions:
-                                reactions.append(
-                                    {"emoji": str(reaction.emoji), "count": reaction.count}
-                                )
-    
-                            # メンション情報
-                            mentions = [user.display_name for user in message.mentions]
-    
-                            # メッセージデータ
-                            message_data = {
-                                "timestamp": message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                                "author_name": message.author.display_name,
-                                "author_id": str(message.author.id),
-                                "content": message.content,
-                                "message_id": str(message.id),
-                                "guild_name": guild_name,
-                                "channel_name": channel_name,
-                                "edited_at": message.edited_at.strftime("%Y-%m-%d %H:%M:%S")
-                                if message.edited_at
-                                else "",
-                                "reply_to": str(message.reference.message_id)
-                                if message.reference
-                                else "",
-                                "attachments_count": len(attachments),
-                                "attachments_urls": "; ".join(
-                                    [att["url"] for att in attachments]
-                                ),
-                                "reactions_count": len(reactions),
-                                "reactions": "; ".join(
-                                    [f"{r['emoji']}({r['count']})" for r in reactions]
-                                ),
-                                "mentions": "; ".join(mentions),
-                                "is_bot": message.author.bot,
-                                "message_type": str(message.type),
-                            }
-    
-                            all_messages_data.append(message_data)
-                            message_count += 1
-    
-                            if message_count % 100 == 0:
-                                print(f"  取得済み: {message_count} メッセージ")
-                                
-                        except Exception as msg_error:
-                            # print(f"  メッセージ処理エラー (message_count={message_count}): {msg_error}")
-                            # print(f"    問題のメッセージID: {getattr(message, 'id', 'Unknown')}")
-                            # print(f"    created_at: {getattr(message, 'created_at', 'Unknown')} (type: {type(getattr(message, 'created_at', None))})")
+                            )
+                            simple_count += 1
+                        except Exception as simple_error:
+                            # print(f"    シンプルメッセージ処理エラー: {simple_error}")
                             continue
-                            
-                except Exception as history_error:
-                    # print(f"  メッセージ履歴取得エラー: {history_error}")
-                    # print(f"  エラーの種類: {type(history_error).__name__}")
                     
-                    # 代替手法を試行
-                    # print("  代替手法で再試行...")
-                    try:
-                        # 最もシンプルなメッセージ取得
-                        # print("    シンプルなhistory(limit=10)で再試行")
-                        simple_count = 0
-                        async for simple_message in messageable_channel.history(limit=10):
-                            try:
-                                simple_data = {
-                                    "timestamp": simple_message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                                    "author_name": simple_message.author.display_name,
-                                    "author_id": str(simple_message.author.id),
-                                    "content": simple_message.content,
-                                    "message_id": str(simple_message.id),
-                                    "guild_name": guild_name,
-                                    "channel_name": channel_name,
-                                    "edited_at": "",
-                                    "reply_to": "",
-                                    "attachments_count": 0,
-                                    "attachments_urls": "",
-                                    "reactions_count": 0,
-                                    "reactions": "",
-                                    "mentions": "",
-                                    "is_bot": simple_message.author.bot,
-                                    "message_type": str(simple_message.type),
-                                }
-                                all_messages_data.append(simple_data)
-                                simple_count += 1
-                            except Exception as simple_error:
-                                # print(f"    シンプルメッセージ処理エラー: {simple_error}")
-                                continue
-                        
-                        # print(f"  代替手法で{simple_count}件取得成功")
-                        message_count = simple_count
-                        
-                    except Exception as fallback_error:
-                        # print(f"  代替手法も失敗: {fallback_error}")
-                        # print(f"  チャンネル '{channel_name}' をスキップします")
-                        continue
+                    # print(f"  代替手法で{simple_count}件取得成功")
+                    message_count = simple_count
+                    
+                except Exception as fallback_error:
+                    # print(f"  代替手法も失敗: {fallback_error}")
+                    # print(f"  チャンネル '{channel_name}' をスキップします")
+                    flush_rows()
+                    return
+
+            flush_rows()
+            print(f"✅ {channel_name}: {message_count} メッセージ取得完了")
 
-                print(f"✅ {channel_name}: {message_count} メッセージ取得完了")
+        fetch_tasks = []
 
-            if not all_messages_data:
+        try:
+            # 選択順で待っているチャンネルから EXPORT_CONCURRENCY 個先までを並行して取得する
+            for index in range(len(selected_channels)):
+                while len(fetch_tasks) < min(index + EXPORT_CONCURRENCY, len(selected_channels)):
+                    channel_index = len(fetch_tasks)
+                    fetch_tasks.append(
+                        asyncio.create_task(
+                            fetch_channel(channel_index, selected_channels[channel_index])
+                        )
+                    )
+                await fetch_tasks[index]
+
+            if not total_messages:
                 print("❌ エクスポートするメッセージがありません")
                 return False
 
-            print(f"\nデータ処理を開始... (総メッセージ数: {len(all_messages_data)})")
+            print(f"\nデータ処理を開始... (総メッセージ数: {total_messages})")
             
             # DataFrameに変換
             try:
-                df = pd.DataFrame(all_messages_data)
+                if spool_writer is not None:
+                    spool_writer.close()
+                    df = pq.read_table(spool_file).to_pandas()
+                else:
+                    df = pd.concat(message_frames, ignore_index=True)
+                del message_frames[:]
+
+                # チャンネルは選択順、チャンネル内は日時順に並べる（安定ソート）
+                df = df.sort_values(
+                    ["channel_index", "timestamp"], kind="stable", ignore_index=True
+                ).drop(columns="channel_index")
+
+                # 種類の少ない文字列列はcategory型にして、groupbyを整数コードで行わせる
+                for column in ("guild_name", "channel_name", "author_name", "message_type"):
+                    df[column] = df[column].astype("category")
                 # print(f"DataFrame作成完了: {len(df)} rows, {len(df.columns)} columns")
                 
                 # ソート前にデータ型を確認
@@ -1788,11 +2463,6 @@ class DiscordExporter:
                 # if len(df) > 0:
                 #     print(f"timestampサンプル: {df['timestamp'].iloc[0]} (type: {type(df['timestamp'].iloc[0])})")
                 
-                # ソート処理
-                # print("DataFrameをソート中...")
-                df = df.sort_values(["guild_name", "channel_name", "timestamp"])
-                # print("ソート完了")
-                
             except Exception as df_error:
                 # print(f"データ処理エラー: {df_error}")
                 # print(f"エラーの種類: {type(df_error).__name__}")
@@ -1806,91 +2476,63 @@ class DiscordExporter:
                 
                 return False
 
-            # Excelファイルに保存
-            with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-                # メインシート
-                df.to_excel(writer, sheet_name="All_Messages", index=False)
-
-                # チャンネル別統計
-                channel_stats = (
-                    df.groupby(["guild_name", "channel_name"])
-                    .agg(
-                        {
-                            "message_id": "count",
-                            "author_name": "nunique",
-                            "attachments_count": "sum",
-                            "reactions_count": "sum",
-                        }
-                    )
-                    .rename(
-                        {
-                            "message_id": "メッセージ数",
-                            "author_name": "ユニークユーザー数",
-                            "attachments_count": "添付ファイル数",
-                            "reactions_count": "リアクション数",
-                        },
-                        axis=1,
-                    )
-                    .reset_index()
-                )
-
-                channel_stats.to_excel(
-                    writer, sheet_name="Channel_Statistics", index=False
+            # ユーザー別統計（メッセージ全体を集計するのはこの一回だけ）
+            user_stats = (
+                df.groupby(["guild_name", "channel_name", "author_name"], observed=True)
+                .agg(
+                    メッセージ数=("message_id", "size"),
+                    添付ファイル数=("attachments_count", "sum"),
+                    リアクション数=("reactions_count", "sum"),
                 )
+                .reset_index()
+            )
 
-                # ユーザー別統計
-                user_stats = (
-                    df.groupby(["guild_name", "channel_name", "author_name"])
-                    .agg(
-                        {
-                            "message_id": "count",
-                            "attachments_count": "sum",
-                            "reactions_count": "sum",
-                        }
-                    )
-                    .rename(
-                        {
-                            "message_id": "メッセージ数",
-                            "attachments_count": "添付ファイル数",
-                            "reactions_count": "リアクション数",
-                        },
-                        axis=1,
-                    )
-                    .reset_index()
+            # チャンネル別統計（ユーザー別統計を集約し直す。ユーザー数は各チャンネルの行数）
+            channel_stats = (
+                user_stats.groupby(["guild_name", "channel_name"], observed=True)
+                .agg(
+                    メッセージ数=("メッセージ数", "sum"),
+                    ユニークユーザー数=("author_name", "size"),
+                    添付ファイル数=("添付ファイル数", "sum"),
+                    リアクション数=("リアクション数", "sum"),
                 )
+                .reset_index()
+            )
 
-                user_stats.to_excel(writer, sheet_name="User_Statistics", index=False)
-
-                # 全体統計
-                total_stats = {
-                    "メトリック": [
-                        "総メッセージ数",
-                        "総チャンネル数",
-                        "総ユーザー数",
-                        "総添付ファイル数",
-                        "リアクション付きメッセージ数",
-                        "エクスポート日時",
-                    ],
-                    "値": [
-                        len(df),
-                        df["channel_name"].nunique(),
-                        df["author_name"].nunique(),
-                        df["attachments_count"].sum(),
-                        len(df[df["reactions_count"] > 0]),
-                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    ],
-                }
+            # チャンネル数・ユーザー数は全体統計と完了メッセージで使うので一度だけ数える
+            channel_count = df["channel_name"].nunique()
+            user_count = df["author_name"].nunique()
+
+            # 全体統計（数行だけなのでDataFrameにせず見出し行から始まる行のリストで渡す）
+            total_stats_rows = [
+                ("メトリック", "値"),
+                ("総メッセージ数", len(df)),
+                ("総チャンネル数", channel_count),
+                ("総ユーザー数", user_count),
+                ("総添付ファイル数", int(channel_stats["添付ファイル数"].sum())),
+                ("リアクション付きメッセージ数", int((df["reactions_count"] > 0).sum())),
+                ("エクスポート日時", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            ]
 
-                total_stats_df = pd.DataFrame(total_stats)
-                total_stats_df.to_excel(
-                    writer, sheet_name="Total_Statistics", index=False
-                )
+            # Excelファイルに保存（イベントループを塞がないようワーカースレッドで実行）
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                write_export,
+                output_file,
+                [
+                    ("All_Messages", df),
+                    ("Channel_Statistics", channel_stats),
+                    ("User_Statistics", user_stats),
+                    ("Total_Statistics", total_stats_rows),
+                ],
+                detect_export_format(output_file, output_format),
+            )
 
             print("\n✅ エクスポート完了!")
             print(f"   ファイル: {output_file}")
             print(f"   総メッセージ数: {len(df):,}")
-            print(f"   チャンネル数: {df['channel_name'].nunique()}")
-            print(f"   ユーザー数: {df['author_name'].nunique()}")
+            print(f"   チャンネル数: {channel_count}")
+            print(f"   ユーザー数: {user_count}")
             
             # エクスポート完了後の継続確認
             return True
@@ -1902,8 +2544,18 @@ class DiscordExporter:
             print(f"スタックトレース: {traceback.format_exc()}")
             return False
         finally:
-            # クリーンアップを実行
-            await self.cleanup_client()
+            # 中断された場合は取得中のチャンネルも止める
+            for fetch_task in fetch_tasks:
+                fetch_task.cancel()
+            await asyncio.gather(*fetch_tasks, return_exceptions=True)
+            if spool_writer is not None:
+                spool_writer.close()
+            if spool_file is not None and os.path.exists(spool_file):
+                os.remove(spool_file)
+
+            # クリーンアップを実行（login() で接続した場合は次の処理で再利用する）
+            if not self._logged_in:
+                await self.cleanup_client()
 
 
 async def main():
@@ -1924,19 +2576,31 @@ async def main():
             "-c", "--channel", type=int, help="Single channel ID (legacy mode)"
         )
         parser.add_argument("-o", "--output", help="Output XLSX file")
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            help="Output format (default: inferred from --output extension, else xlsx). "
+            "parquet is recommended for large exports",
+        )
         parser.add_argument("--after", help="After date (YYYY-MM-DD)")
         parser.add_argument("--before", help="Before date (YYYY-MM-DD)")
         parser.add_argument("--limit", type=int, help="Message limit per channel")
         parser.add_argument("--config", action="store_true", help="Launch configuration UI")
+        parser.add_argument("--debug", action="store_true", help="Show debug logs")
 
         args = parser.parse_args()
 
+        if args.debug:
+            logging.basicConfig(format="%(levelname)s: %(message)s")
+            logger.setLevel(logging.DEBUG)
+
         # 引数が何も指定されていない場合、または--configが指定された場合はメインメニューを起動
-        if not any(vars(args).values()) or args.config:
+        options = {key: value for key, value in vars(args).items() if key != "debug"}
+        if not any(options.values()) or args.config:
             try:
                 print("Discord Exporter を起動中...")
                 
-                # メインメニューループ
+                # メインメニューループ（Discordへの接続は終了まで使い回す）
                 temp_exporter = DiscordExporter("")
                 exporter = temp_exporter
                 
@@ -1965,16 +2629,15 @@ async def main():
                                 continue
                             
                             print("チャンネル情報を更新中...")
-                            temp_exporter.token = config["token"]
-                            
-                            # Discord接続してチャンネル情報を更新
-                            @temp_exporter.client.event
-                            async def on_ready():
-                                print(f"ログイン: {temp_exporter.client.user}")
-                                await temp_exporter.fetch_and_save_channels()
                             
+                            # Discord接続してチャンネル情報を更新（ログイン済みの接続は再利用）
                             try:
-                                await temp_exporter.client.start(config["token"])
+                                try:
+                                    await temp_exporter.login(config["token"])
+                                    await temp_exporter.fetch_and_save_channels()
+                                finally:
+                                    # メニュー表示中はゲートウェイ接続を閉じておく
+                                    await temp_exporter.disconnect_gateway()
                                 
                                 # 更新完了後の継続確認
                                 if not temp_exporter.ask_continue():
@@ -1990,12 +2653,7 @@ async def main():
                                 if not temp_exporter.ask_continue():
                                     await temp_exporter.cleanup_client()
                                     return
-                            finally:
-                                # 必ずクリーンアップを実行
-                                await temp_exporter.cleanup_client()
                             
-                            # 新しいクライアントインスタンスを作成（接続をリセット）
-                            temp_exporter = DiscordExporter("")
                             continue
                         
                         elif action == "export_interactive":
@@ -2027,9 +2685,6 @@ async def main():
                                         return
                                     continue
                                 
-                                # エクスポート実行
-                                temp_exporter.token = config["token"]
-                                
                                 after_date = None
                                 before_date = None
                                 
@@ -2045,14 +2700,15 @@ async def main():
                                     except ValueError:
                                         pass
                                 
-                                @temp_exporter.client.event
-                                async def on_ready():
-                                    print(f"ログイン: {temp_exporter.client.user}")
-                                    return await temp_exporter.export_multiple_channels(
+                                # エクスポート実行（ログイン済みの接続は再利用）
+                                try:
+                                    await temp_exporter.login(config["token"])
+                                    await temp_exporter.export_multiple_channels(
                                         selected_channels, config["output_file"], after_date, before_date, config.get("limit")
                                     )
-                                
-                                await temp_exporter.client.start(config["token"])
+                                finally:
+                                    # メニュー表示中はゲートウェイ接続を閉じておく
+                                    await temp_exporter.disconnect_gateway()
                                 
                                 # エクスポート完了後の継続確認
                                 if not temp_exporter.ask_continue():
@@ -2068,12 +2724,7 @@ async def main():
                                 if not temp_exporter.ask_continue():
                                     await temp_exporter.cleanup_client()
                                     return
-                            finally:
-                                # 必ずクリーンアップを実行
-                                await temp_exporter.cleanup_client()
                             
-                            # 新しいクライアントインスタンスを作成
-                            temp_exporter = DiscordExporter("")
                             continue
                         
                         elif action == "config":
@@ -2159,7 +2810,8 @@ async def main():
                 async def on_ready():
                     print(f"ログイン: {exporter.client.user}")
                     await exporter.export_multiple_channels(
-                        selected_channels, args.output, after_date, before_date, args.limit
+                        selected_channels, args.output, after_date, before_date, args.limit,
+                        args.format,
                     )
 
                 await exporter.client.start(args.token)
@@ -2176,7 +2828,8 @@ async def main():
                 async def on_ready():
                     print(f"ログイン: {exporter.client.user}")
                     await exporter.export_multiple_channels(
-                        selected_channels, args.output, after_date, before_date, args.limit
+                        selected_channels, args.output, after_date, before_date, args.limit,
+                        args.format,
                     )
 
                 await exporter.client.start(args.token)
@@ -2187,7 +2840,8 @@ async def main():
                 async def on_ready():
                     print(f"ログイン: {exporter.client.user}")
                     await exporter.export_channel_to_xlsx(
-                        args.channel, args.output, after_date, before_date, args.limit
+                        args.channel, args.output, after_date, before_date, args.limit,
+                        args.format,
                     )
 
                 await exporter.client.start(args.token)